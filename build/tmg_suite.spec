@@ -20,6 +20,13 @@ a = Analysis(
     binaries=[],
     datas=[],
     hiddenimports=[
+        # Suite modules loaded dynamically (find_spec / import_module in
+        # _load_engine): PyInstaller's analysis cannot see them
+        'mapping_tool',
+        'sentence_injector',
+        'role_injector',
+        'dbf_fast',
+        'tmg_process',
         'tkinter',
         'tkinter.ttk',
         'tkinter.filedialog',
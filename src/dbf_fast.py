@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+dbf_fast.py - Lecture directe des tables VFP de TMG
+====================================================
+Les tables TMG (.DBF + mémo .FPT) sont mappées en mémoire et chaque champ
+est décodé par tranche avec des struct précompilés : pas d'objet Record
+par ligne ni de dispatch de type côté librairie dbf.
+
+Lecture seule : les écritures passent toujours par la librairie dbf.
+Les appelants gardent la librairie dbf en repli si la lecture échoue.
+copy_file() / copy_files() servent aux backups des injecteurs.
+"""
+
+import os
+import sys
+import mmap
+import shutil
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+# Formats binaires VFP, compilés une fois pour toutes
+DBF_HEADER = struct.Struct('<IHH')  # Nb records, taille en-tête, taille record (offset 4)
+INT32_LE = struct.Struct('<i')      # Champ I
+UINT32_LE = struct.Struct('<I')     # Champ M (numéro de bloc VFP)
+FPT_NEXT_BLOCK = struct.Struct('>I')  # Prochain bloc libre FPT (offset 0)
+FPT_BLOCK_SIZE = struct.Struct('>H')  # Taille de bloc FPT (offset 6)
+FPT_MEMO_HEADER = struct.Struct('>II')  # En-tête de bloc mémo : type, longueur
+FPT_MEMO_TEXT = 1  # Type de bloc mémo texte
+
+_TRUE_BYTES = frozenset(b'TtYy')
+
+COPY_BUFFER_SIZE = 4 << 20  # 4 Mo par lecture/écriture pour les backups
+COPY_WORKERS = 4  # Copies de backup menées en parallèle (I/O, hors GIL)
+
+class DBFMmap:
+    """
+    Lecture directe d'une table VFP (.DBF + mémo .FPT) via mmap.
+    
+    Un seul mappage par fichier ; chaque enregistrement est décodé par
+    tranche dans le tampon mappé. Valeurs rendues comme la librairie dbf :
+    C sans les blancs de fin, N/F en int ou float selon le nombre de
+    décimales du champ.
+    
+    Le FPT est contrôlé comme dans load_host_ddbf de mapping_tool (taille
+    de bloc = taille du fichier / prochain bloc libre) et chaque bloc mémo
+    lu est vérifié (type texte, dans le fichier) : toute incohérence lève
+    ValueError pour que l'appelant repasse par la librairie dbf au lieu
+    de lire des octets quelconques.
+    """
+    def __init__(self, dbf_path):
+        self._handles = []
+        try:
+            self._open(dbf_path)
+        except Exception:
+            self.close()
+            raise
+    
+    def _open(self, dbf_path):
+        self.mm = self._map(dbf_path)
+        fpt_path = os.path.splitext(dbf_path)[0] + '.FPT'
+        self.fpt = self._map(fpt_path) if os.path.exists(fpt_path) else None
+        
+        mm = self.mm
+        self.num_recs, self.hdr_size, self.rec_size = DBF_HEADER.unpack_from(mm, 4)
+        
+        # Descripteurs de champs : {nom: (type, offset dans le record, longueur, décimales)}
+        self.fields = {}
+        off = 32
+        pos = 1  # Octet 0 = drapeau de suppression
+        while off < self.hdr_size and mm[off] != 0x0D:
+            fname = mm[off:off+11].split(b'\x00')[0].decode('ascii', errors='replace')
+            ftype = chr(mm[off+11])
+            flen = mm[off+16]
+            self.fields[fname] = (ftype, pos, flen, mm[off+17])
+            pos += flen
+            off += 32
+        
+        # FPT : taille de bloc (octets 6-7, big-endian), recoupée avec le
+        # prochain bloc libre comme dans load_host_ddbf
+        self.block_size = 0
+        self.next_block = 0
+        if self.fpt is not None:
+            self.next_block = FPT_NEXT_BLOCK.unpack_from(self.fpt, 0)[0]
+            self.block_size = FPT_BLOCK_SIZE.unpack_from(self.fpt, 6)[0]
+            if (not self.next_block or not self.block_size
+                    or len(self.fpt) // self.next_block != self.block_size):
+                raise ValueError(f"En-tête FPT incohérent : {fpt_path}")
+    
+    def _map(self, path):
+        f = open(path, 'rb')
+        self._handles.append(f)
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._handles.append(mm)
+        return mm
+    
+    def close(self):
+        for handle in reversed(self._handles):
+            handle.close()
+        self._handles = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def record_offsets(self):
+        """Offsets de tous les enregistrements (comme l'itération dbf.Table)"""
+        return range(self.hdr_size, self.hdr_size + self.num_recs * self.rec_size, self.rec_size)
+    
+    def value(self, rec_off, name):
+        """Décode le champ `name` de l'enregistrement situé à rec_off"""
+        ftype, pos, flen, decimals = self.fields[name]
+        start = rec_off + pos
+        if ftype == 'I':
+            return INT32_LE.unpack_from(self.mm, start)[0]
+        raw = self.mm[start:start+flen]
+        if ftype == 'C':
+            return raw.decode('cp1252').rstrip()
+        if ftype in ('N', 'F'):
+            text = raw.strip()
+            if not text:
+                return 0
+            return float(text) if decimals else int(text)
+        if ftype == 'L':
+            return raw[0] in _TRUE_BYTES
+        if ftype == 'M':
+            if flen == 4:
+                block = UINT32_LE.unpack_from(self.mm, start)[0]
+            else:
+                block = int(raw.strip() or 0)
+            return self._memo(block)
+        raise ValueError(f"Type de champ non géré : {name} ({ftype})")
+    
+    def rows(self, names):
+        """
+        Itère les enregistrements en tuples des champs `names` (insensible
+        à la casse) ; None pour un champ absent de la table.
+        """
+        keys = [name.upper() for name in names]
+        present = [(i, key) for i, key in enumerate(keys) if key in self.fields]
+        width = len(keys)
+        value = self.value
+        for off in self.record_offsets():
+            row = [None] * width
+            for i, key in present:
+                row[i] = value(off, key)
+            yield tuple(row)
+    
+    def _memo(self, block):
+        if block == 0:
+            return ''
+        if self.fpt is None:
+            raise ValueError("Mémo .FPT indisponible")
+        if block >= self.next_block:
+            raise ValueError(f"Bloc mémo {block} hors du FPT")
+        memo_off = block * self.block_size
+        memo_type, memo_len = FPT_MEMO_HEADER.unpack_from(self.fpt, memo_off)
+        end = memo_off + 8 + memo_len
+        if memo_type != FPT_MEMO_TEXT or end > len(self.fpt):
+            raise ValueError(f"Bloc mémo {block} invalide (type {memo_type}, longueur {memo_len})")
+        return self.fpt[memo_off + 8:end].decode('cp1252')
+
+def copy_file(src, dst):
+    """
+    Copie src -> dst avec métadonnées, comme shutil.copy2.
+    
+    Sous Windows, copie système CopyFileW (côté noyau/système de fichiers,
+    dates et attributs conservés) ; repli sur copyfileobj avec un tampon
+    de 4 Mo. Ailleurs shutil.copy2 utilise déjà la copie noyau
+    (sendfile / fcopyfile).
+    """
+    if sys.platform != 'win32':
+        return shutil.copy2(src, dst)
+    if _win_copy_file(src, dst):
+        return dst
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
+    shutil.copystat(src, dst)
+    return dst
+
+def copy_files(pairs):
+    """
+    Copie chaque (src, dst) de pairs avec copy_file, en parallèle.
+    Retourne les dst dans l'ordre de pairs ; la première erreur est relevée.
+    """
+    pairs = list(pairs)
+    if len(pairs) < 2:
+        return [copy_file(src, dst) for src, dst in pairs]
+    with ThreadPoolExecutor(max_workers=min(COPY_WORKERS, len(pairs))) as pool:
+        return list(pool.map(lambda pair: copy_file(*pair), pairs))
+
+def _win_copy_file(src, dst):
+    """CopyFileW de kernel32 ; False si indisponible ou en échec"""
+    try:
+        import ctypes
+        copy = ctypes.windll.kernel32.CopyFileW
+    except (ImportError, AttributeError):
+        return False
+    return bool(copy(os.path.abspath(src), os.path.abspath(dst), False))
+
+def read_rows(dbf_path, names):
+    """Tous les enregistrements de dbf_path en tuples des champs `names`"""
+    with DBFMmap(dbf_path) as table:
+        return list(table.rows(names))
@@ -32,6 +32,7 @@ import sys
 import os
 import json
 import re
+import hashlib
 import unicodedata
 from collections import defaultdict
 
@@ -44,6 +45,11 @@ except ImportError:
     print("ERROR: pip install dbf.py openpyxl")
     sys.exit(1)
 
+try:
+    import orjson  # Optionnel : (dé)sérialisation JSON en C, plus rapide que json
+except ImportError:
+    orjson = None
+
 # =============================================================================
 # CONFIGURATION — GUI uniquement, rien de hardcodé
 # =============================================================================
@@ -56,6 +62,10 @@ TMG_PREFIX   = None
 EXCEL_FILE   = "mapping_master.xlsx"
 JSON_FILE    = "mapping.json"
 LOG_CALLBACK = None  # Callback optionnel pour logs vers GUI
+GEDCOM_STATS = None  # Stats du dernier scan_gedcom (reprises dans mapping.json)
+GEDCOM_READ_BUFFER = 1 << 20  # Tampon de lecture séquentielle du GEDCOM (1 Mo)
+SCAN_CACHE_FILE = ".mapping_cache.json"  # Résultat de scan_gedcom, dans le dossier TMG
+SCAN_CACHE_VERSION = 1  # À incrémenter si la sortie de scan_gedcom/normalize change
 
 def log(message, level='INFO'):
     """
@@ -303,6 +313,16 @@ def load_host_ddbf():
         return host_map
 
 
+def write_json(path, data):
+    """Écrit data en JSON indenté UTF-8 (orjson si disponible)"""
+    if orjson:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
 def load_memory_json():
     """Charge mapping.json précédent s'il existe."""
     events_json = {}
@@ -311,8 +331,9 @@ def load_memory_json():
         return events_json, roles_json
 
     log(f"   💾 Reading previous mapping.json...", 'INFO')
-    with open(JSON_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with open(JSON_FILE, 'rb') as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson else json.loads(raw.decode('utf-8'))
     for k, v in data.get('events', {}).items():
         if v.get('tmg_name'):
             events_json[normalize(k)] = v['tmg_name']
@@ -330,23 +351,31 @@ def scan_gedcom():
     Retourne:
       events: {normalize(key): {'raw': str, 'freq': int}}
       roles:  {normalize(key): {'raw': str, 'freq': int}}
+    
+    Renseigne aussi GEDCOM_STATS (nombre total de références _SHAR @ et
+    signature du fichier) pour éviter un re-scan avant l'injection des rôles.
     """
+    global GEDCOM_STATS
     events = {}
     roles  = {}
+    witness_count = 0
 
     # Première passe: parser les blocs pour capturer events avec _SHAR
     current_evt_key = None  # clé normalisée de l'event en cours
     current_evt_raw = None  # forme originale
     evt_has_shar = False
 
-    with open(GEDCOM_PATH, 'r', encoding='ansi') as f:
+    with open(GEDCOM_PATH, 'r', encoding='ansi', buffering=GEDCOM_READ_BUFFER) as f:
         for line in f:
-            p = line.strip().split(' ', 2)
-            if len(p) < 2:
+            # Niveau, tag, valeur par partition (pas de liste par ligne)
+            lvl, _, rest = line.strip().partition(' ')
+            if not rest:
                 continue
-            lvl = p[0]
-            tag = p[1]
-            val = p[2].strip() if len(p) > 2 else ""
+            tag, _, val = rest.partition(' ')
+            val = val.strip()
+
+            if tag == '_SHAR' and val.startswith('@'):
+                witness_count += 1
 
             if lvl == '0':
                 current_evt_key = None
@@ -384,12 +413,70 @@ def scan_gedcom():
                         roles[nk] = {'raw': val, 'freq': 0}
                     roles[nk]['freq'] += 1
 
+    st = os.stat(GEDCOM_PATH)
+    GEDCOM_STATS = {
+        'gedcom': os.path.abspath(GEDCOM_PATH),
+        'mtime_ns': st.st_mtime_ns,
+        'size': st.st_size,
+        'witness_count': witness_count
+    }
+
+    return events, roles
+
+
+def _gedcom_fingerprint(path):
+    """
+    Clé du cache : version du format, chemin, mtime, taille + hash du 1er Mo
+    du GEDCOM (liste, pour se comparer telle quelle après relecture JSON)
+    """
+    st = os.stat(path)
+    with open(path, 'rb') as f:
+        head = hashlib.blake2b(f.read(1 << 20), digest_size=16).hexdigest()
+    return [SCAN_CACHE_VERSION, os.path.abspath(path), st.st_mtime_ns, st.st_size, head]
+
+
+def scan_gedcom_cached(force=False):
+    """
+    scan_gedcom() avec cache disque (SCAN_CACHE_FILE dans le dossier TMG).
+    
+    Le cache n'est réutilisé que si l'empreinte du GEDCOM (et la version du
+    format) est identique ; force=True ignore le cache et le réécrit.
+    Stocké en JSON : le fichier, dans un dossier synchronisé, n'est jamais
+    exécuté à la relecture (pas de pickle).
+    """
+    global GEDCOM_STATS
+    cache_path = os.path.join(TMG_PATH, SCAN_CACHE_FILE) if TMG_PATH else SCAN_CACHE_FILE
+    key = _gedcom_fingerprint(GEDCOM_PATH)
+
+    if not force and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                raw = f.read()
+            cached = orjson.loads(raw) if orjson else json.loads(raw.decode('utf-8'))
+            if cached.get('key') == key:
+                log("   ♻️  GEDCOM inchangé - scan en cache réutilisé", 'INFO')
+                GEDCOM_STATS = cached['stats']
+                return cached['events'], cached['roles']
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            log(f"   ⚠️  Cache de scan illisible ({e}) - re-scan", 'WARNING')
+
+    events, roles = scan_gedcom()
+
+    try:
+        write_json(cache_path, {'key': key, 'events': events, 'roles': roles,
+                                'stats': GEDCOM_STATS})
+    except OSError as e:
+        log(f"   ⚠️  Cache de scan non écrit : {e}", 'WARNING')
+
     return events, roles
 
 
 # =============================================================================
 # 3. SCAN T.DBF — events + rôles avec labels EN/FR
 # =============================================================================
+_ROLE_BLOCK_RE = re.compile(r'\[RL=(\d+)\](.*?)(?=\[RL=|\[:LABELS\]|$)', re.DOTALL)
+_ROLE_LABEL_RE = re.compile(r'\[L=([^\]]+)\]([^\[\r\n]+)')
+
 def scan_tdbf():
     """
     Retourne:
@@ -399,9 +486,6 @@ def scan_tdbf():
     events_tmg = {}
     roles_tmg  = {}
 
-    regex_role  = re.compile(r'\[RL=(\d+)\](.*?)(?=\[RL=|\[:LABELS\]|$)', re.DOTALL)
-    regex_label = re.compile(r'\[L=([^\]]+)\]([^\[\r\n]+)')
-
     t = dbf.Table(get_tmg_file("T"))
     t.open()
     for rec in t:
@@ -415,11 +499,11 @@ def scan_tdbf():
             continue
         try:
             labels_section = sent.split('[LABELS:]')[1].split('[:LABELS]')[0]
-            for m in regex_role.finditer(labels_section):
+            for m in _ROLE_BLOCK_RE.finditer(labels_section):
                 code  = m.group(1)
                 block = m.group(2)
                 eng = fra = None
-                for lm in regex_label.finditer(block):
+                for lm in _ROLE_LABEL_RE.finditer(block):
                     lang  = lm.group(1).upper()
                     label = lm.group(2).strip()
                     if lang == 'ENGLISH':
@@ -821,6 +905,8 @@ def compile_json():
         'events': {},
         'roles':  {}
     }
+    if GEDCOM_STATS:
+        mapping['_meta']['gedcom_stats'] = GEDCOM_STATS
 
     errors = []
 
@@ -863,8 +949,7 @@ def compile_json():
         }
 
     # Écriture JSON
-    with open(JSON_FILE, 'w', encoding='utf-8') as f:
-        json.dump(mapping, f, indent=2, ensure_ascii=False)
+    write_json(JSON_FILE, mapping)
 
     log(f"\n✅ mapping.json écrit: {JSON_FILE}", 'SUCCESS')
     log(f"   {len(mapping['events'])} events, {len(mapping['roles'])} roles", 'INFO')
@@ -881,7 +966,8 @@ def compile_json():
 # =============================================================================
 # FONCTIONS MODE DUAL (CLI / GUI)
 # =============================================================================
-def generate_excel_mode(gedcom_path=None, tmg_project_path=None, tmg_prefix=None, log_callback=None):
+def generate_excel_mode(gedcom_path=None, tmg_project_path=None, tmg_prefix=None, log_callback=None,
+                        force_rescan=False):
     """
     Génère Excel de mapping - Mode dual CLI/GUI
     
@@ -894,6 +980,8 @@ def generate_excel_mode(gedcom_path=None, tmg_project_path=None, tmg_prefix=None
         → paramètres fournis → pas de dialogue
         → logs vers callback
     
+    force_rescan=True ignore le cache du scan GEDCOM (SCAN_CACHE_FILE)
+    
     Returns:
         str: Chemin vers le fichier Excel généré
     """
@@ -914,7 +1002,7 @@ def generate_excel_mode(gedcom_path=None, tmg_project_path=None, tmg_prefix=None
     
     # Workflow identique pour CLI et GUI
     log("\n📖 Scan GEDCOM...", 'INFO')
-    events_ged, roles_ged = scan_gedcom()
+    events_ged, roles_ged = scan_gedcom_cached(force=force_rescan)
     log(f"   {len(events_ged)} events with _SHAR, {len(roles_ged)} roles", 'INFO')
 
     log("📖 Scan T.DBF...", 'INFO')
@@ -973,6 +1061,8 @@ def compile_json_mode(excel_file=None, json_file=None, log_callback=None):
         'events': {},
         'roles':  {}
     }
+    if GEDCOM_STATS:
+        mapping['_meta']['gedcom_stats'] = GEDCOM_STATS
 
     errors = []
 
@@ -1023,8 +1113,7 @@ def compile_json_mode(excel_file=None, json_file=None, log_callback=None):
         return None, errors
 
     # Écriture JSON
-    with open(JSON_FILE, 'w', encoding='utf-8') as f:
-        json.dump(mapping, f, indent=2, ensure_ascii=False)
+    write_json(JSON_FILE, mapping)
 
     log(f"\n✅ mapping.json écrit: {JSON_FILE}", 'SUCCESS')
     log(f"   {len(mapping['events'])} events, {len(mapping['roles'])} roles", 'SUCCESS')
@@ -34,13 +34,16 @@ import re
 import os
 import sys
 import unidecode
-import shutil
+import unicodedata
 from datetime import datetime
 import argparse
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import platform
-import subprocess
+import functools
+import atexit
+
+import dbf_fast
+from tmg_process import is_tmg_running
 
 print("=" * 80)
 print("   SUPER-INJECTEUR TMG v16_CLEAN — RED/GREEN LOGIC")
@@ -49,40 +52,21 @@ print()
 
 import json
 
+try:
+    import orjson  # Optionnel : (dé)sérialisation JSON en C, plus rapide que json
+except ImportError:
+    orjson = None
+
+def _load_json(path):
+    """Charge un fichier JSON UTF-8 (orjson si disponible)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw.decode('utf-8'))
+
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
 
-def is_tmg_running():
-    """
-    Vérifie si The Master Genealogist est en cours d'exécution.
-    Supporte TMG v7, v8, v9 (tmg7.exe, tmg8.exe, tmg9.exe).
-    
-    CRITIQUE : Modifier les fichiers DBF pendant que TMG est ouvert peut causer
-    une corruption de base de données.
-    
-    Returns:
-        bool: True si un processus TMG est détecté
-    """
-    if platform.system() == 'Windows':
-        try:
-            # Vérifier les 3 versions possibles
-            for exe_name in ['tmg9.exe', 'tmg8.exe', 'tmg7.exe']:
-                result = subprocess.run(
-                    ['tasklist', '/FI', f'IMAGENAME eq {exe_name}'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if exe_name in result.stdout:
-                    return True
-            return False
-        except Exception as e:
-            # Si la vérification échoue, on continue (mieux que bloquer)
-            print(f"⚠️  Warning: Cannot check if TMG is running: {e}")
-            return False
-    return False  # Sur non-Windows, on assume que c'est OK
-
 def normalize_role_id(val):
     """
     Normalise un ID de rôle en chaîne '00000'.
@@ -115,10 +99,41 @@ MAPPING_FILE = "mapping.json"
 # =============================================================================
 # NORMALISATION — doit être définie avant load_mapping()
 # =============================================================================
+# Lettres de Latin-1 / Latin Extended-A sans décomposition NFKD
+# (mêmes translittérations que unidecode)
+_ACCENT_SPECIAL = {
+    'Æ': 'AE', 'æ': 'ae', 'Ð': 'D', 'ð': 'd', '×': 'x', '÷': '/',
+    'Ø': 'O', 'ø': 'o', 'Þ': 'Th', 'þ': 'th', 'ß': 'ss',
+    'Đ': 'D', 'đ': 'd', 'Ħ': 'H', 'ħ': 'h', 'ı': 'i', 'ĸ': 'q',
+    'Ł': 'L', 'ł': 'l', 'ŉ': "'n", 'Ŋ': 'NG', 'ŋ': 'ng', 'Œ': 'OE', 'œ': 'oe',
+}
+
+def _build_accent_table():
+    """Table str.translate pour U+00C0..U+017F (lettres accentuées des GEDCOM ANSI)"""
+    table = {}
+    for cp in range(0xC0, 0x180):
+        base = unicodedata.normalize('NFKD', chr(cp)).encode('ascii', 'ignore').decode('ascii')
+        if base:
+            table[cp] = base
+    table.update({ord(k): v for k, v in _ACCENT_SPECIAL.items()})
+    return table
+
+_ACCENT_TABLE = _build_accent_table()
+
+@functools.lru_cache(maxsize=65536)
 def normalize(txt):
-    """Normalisation : MAJUSCULES + sans accents"""
+    """Normalisation : MAJUSCULES + sans accents (mémorisée : rôles/tags très répétés)"""
     if not txt: return ""
-    return unidecode.unidecode(txt).upper().strip()
+    if not txt.isascii():
+        # Cas courant (accents latins) : table précalculée ; unidecode seulement
+        # s'il reste un caractère hors table (autres écritures, ponctuation cp1252)
+        translated = txt.translate(_ACCENT_TABLE)
+        txt = translated if translated.isascii() else unidecode.unidecode(txt)
+    return txt.upper().strip()
+
+def reset_caches():
+    """Vide les caches de normalisation (changement de projet dans une session GUI)"""
+    normalize.cache_clear()
 
 # =============================================================================
 # CHARGEMENT DU MAPPING depuis mapping.json
@@ -134,8 +149,7 @@ def load_mapping():
         print(f"   First run: python mapping_tool.py G  →  validate Excel  →  python mapping_tool.py C")
         sys.exit(1)
 
-    with open(MAPPING_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = _load_json(MAPPING_FILE)
 
     # Normaliser les clés une seule fois au chargement
     EVENTS = {}
@@ -159,7 +173,11 @@ TMG_PREFIX = DEFAULT_TMG_PREFIX
 GEDCOM_PATH = DEFAULT_GEDCOM
 DRY_RUN = False
 LOG_FILE = None
+_LOG_FH = None  # Fichier de log ouvert une fois par LOG_FILE (pas un open par ligne)
 LOG_CALLBACK = None  # Pour mode GUI
+GEDCOM_READ_BUFFER = 1 << 20  # Tampon des lectures séquentielles du GEDCOM (1 Mo)
+GEDCOM_REFNS = None  # (chemin GEDCOM, [(gid, REFN)]) relevé pendant scan_role_usage
+_SEQ_BY_GNUM = {}  # {GNUM: plus grande SEQUENCE dans E.DBF}, tenu à jour pendant l'injection
 
 def log(message, level="INFO"):
     global LOG_CALLBACK
@@ -168,6 +186,11 @@ def log(message, level="INFO"):
     if not isinstance(message, str):
         message = str(message)
     
+    # Mode GUI sans fichier de log : pas de ligne horodatée à formater
+    if LOG_CALLBACK and not LOG_FILE:
+        LOG_CALLBACK(message, level)
+        return
+    
     timestamp = datetime.now().strftime("%H:%M:%S")
     log_line = f"[{timestamp}] [{level}] {message}"
     
@@ -181,8 +204,24 @@ def log(message, level="INFO"):
             print(log_line.encode('utf-8', errors='replace').decode('utf-8'))
     
     if LOG_FILE:
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
-            f.write(log_line + '\n')
+        _log_file_handle().write(log_line + '\n')
+
+def _log_file_handle():
+    """Handle de LOG_FILE, rouvert seulement quand LOG_FILE change (une exécution = un fichier)"""
+    global _LOG_FH
+    if _LOG_FH is None or _LOG_FH.name != LOG_FILE:
+        close_log_file()
+        # Tampon ligne : le log reste complet sur disque si l'injection s'arrête
+        _LOG_FH = open(LOG_FILE, 'a', encoding='utf-8', buffering=1)
+    return _LOG_FH
+
+@atexit.register
+def close_log_file():
+    """Ferme le fichier de log courant (aussi appelé à la sortie du processus)"""
+    global _LOG_FH
+    if _LOG_FH is not None:
+        _LOG_FH.close()
+        _LOG_FH = None
 
 
 def create_backup():
@@ -203,21 +242,24 @@ def create_backup():
         log(f"Backup folder: {backup_dir}", "BACKUP")
         log(f"Filtered prefix: {safe_prefix}", "BACKUP")
         
-        files_copied = 0
-        for file in os.listdir(TMG_PROJECT_PATH):
-            src = os.path.join(TMG_PROJECT_PATH, file)
-            
-            # Ne copier que les fichiers (pas les sous-dossiers)
-            if not os.path.isfile(src):
-                continue
-            
-            # Filtre STRICT: le fichier doit commencer EXACTEMENT par safe_prefix
-            # Ex: safe_prefix="testcase_" → OK: testcase_G.DBF, SKIP: testcase2_G.DBF
-            if file.lower().startswith(safe_prefix.lower()):
-                dst = os.path.join(backup_dir, file)
-                shutil.copy2(src, dst)
-                files_copied += 1
-                log(f"  ✓ {file}", "BACKUP")
+        # scandir : type de fichier fourni par le parcours du dossier,
+        # sans stat par entrée
+        prefix_lower = safe_prefix.lower()
+        to_copy = []
+        with os.scandir(TMG_PROJECT_PATH) as entries:
+            for entry in entries:
+                # Filtre STRICT: le fichier doit commencer EXACTEMENT par safe_prefix
+                # Ex: safe_prefix="testcase_" → OK: testcase_G.DBF, SKIP: testcase2_G.DBF
+                # Ne copier que les fichiers (pas les sous-dossiers)
+                if entry.name.lower().startswith(prefix_lower) and entry.is_file():
+                    to_copy.append(entry)
+        
+        # Copies en parallèle, log dans l'ordre du dossier
+        dbf_fast.copy_files((entry.path, os.path.join(backup_dir, entry.name))
+                            for entry in to_copy)
+        for entry in to_copy:
+            log(f"  ✓ {entry.name}", "BACKUP")
+        files_copied = len(to_copy)
         
         log(f"✅ Backup created: {files_copied} files (DBF+FPT+CDX+PJC+...)", "BACKUP")
         log("=" * 80)
@@ -233,6 +275,8 @@ def get_tmg_file(suffix):
         sys.exit(1)
     return path
 
+_YEAR_RE = re.compile(r'\d{4}')
+
 def extract_year_tmg(edate_str):
     """
     Extrait l'année d'une date TMG
@@ -241,13 +285,17 @@ def extract_year_tmg(edate_str):
     """
     if not edate_str: return None
     
-    # Cas 1: Date précise "1YYYYMMDD"
-    if edate_str.startswith('1') and len(edate_str) >= 5:
-        return edate_str[1:5]
+    kind = edate_str[0]
+    
+    # Cas 1: Date précise "1YYYYMMDD" (tranche directe, pas de regex)
+    if kind == '1':
+        if len(edate_str) >= 5:
+            return edate_str[1:5]
+        return None
     
     # Cas 2: Date floue "0(...)" - cherche 4 chiffres
-    if edate_str.startswith('0'):
-        m = re.search(r'\d{4}', edate_str)
+    if kind == '0':
+        m = _YEAR_RE.search(edate_str)
         if m: return m.group(0)
     
     return None
@@ -263,29 +311,88 @@ def scan_role_usage():
     log("[1/5] GEDCOM SCAN — DETECTING ROLE USAGE (🟢 Normal vs 🔴 Principal)")
     log("=" * 80)
     
-    role_usage = {}
+    global GEDCOM_REFNS
     
+    # Lecture en flux (pas de readlines) ; repli UTF-8 si le décodage ANSI échoue
     try:
-        with open(GEDCOM_PATH, 'r', encoding='ansi') as f:
-            lines = f.readlines()
+        with open(GEDCOM_PATH, 'r', encoding='ansi', buffering=GEDCOM_READ_BUFFER) as f:
+            role_usage, refns = _scan_gedcom_stream(f)
     except UnicodeDecodeError:
-        with open(GEDCOM_PATH, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        with open(GEDCOM_PATH, 'r', encoding='utf-8', buffering=GEDCOM_READ_BUFFER) as f:
+            role_usage, refns = _scan_gedcom_stream(f)
     
+    # Paires GEDCOM → REFN réutilisées par load_persons_and_events (pas de 2e lecture)
+    GEDCOM_REFNS = (GEDCOM_PATH, refns)
+    
+    # --- CORRECTION ICI : La conversion se fait APRES la boucle principale ---
+    for r in role_usage.values():
+        if isinstance(r['events'], set):
+            r['events'] = sorted(list(r['events']))
+    
+    # Affichage résumé
+    log(f"✓ Roles detected: {len(role_usage)}")
+    
+    count_normal = sum(1 for r in role_usage.values() if r['normal'])
+    count_principal = sum(1 for r in role_usage.values() if r['principal'])
+    count_both = sum(1 for r in role_usage.values() if r['normal'] and r['principal'])
+    
+    log(f"  → 🟢 Used as witnesses: {count_normal}")
+    log(f"  → 🔴 Used as principals: {count_principal}")
+    log(f"  → 🟡 Both: {count_both}")
+    
+    # Afficher détails pour debug
+    for role_norm, data in sorted(role_usage.items()):
+        modes = []
+        if data['normal']: modes.append("🟢")
+        if data['principal']: modes.append("🔴")
+        events_str = ", ".join(data['events'][:3])
+        if len(data['events']) > 3:
+            events_str += f" (+{len(data['events'])-3} more)"
+        log(f"     {' '.join(modes)} {data['eng']:<20} → {events_str}")
+    
+    return role_usage
+
+_SCAN_EVENT_TAGS = frozenset({'BIRT', 'DEAT', 'MARR', 'EVEN', 'FACT', 'OCCU',
+                              'BAPM', 'BURI', 'CHR', 'CENS', 'GRAD', 'RESI'})
+_TYPED_EVENT_TAGS = frozenset({'EVEN', 'FACT', 'OCCU'})
+
+def _scan_gedcom_stream(f):
+    """
+    Passe unique sur le GEDCOM (ligne par ligne) :
+    usage des rôles (🟢/🔴) + paires (gid, REFN) des individus
+    """
+    role_usage = {}
+    refns = []  # [(gid, REFN)] dans l'ordre du fichier
+    refn_gid = None
     current_indi_id = None
     current_event_tag = None
     current_event_type = None
     current_event_name_norm = None
     current_shars = []  # Liste de {'id': 'I123', 'role': 'Buyer'}
     
-    for line in lines:
-        parts = line.strip().split(' ', 2)
-        if len(parts) < 2:
-            continue
-            
-        level = int(parts[0])
-        tag = parts[1]
-        val = parts[2] if len(parts) > 2 else ""
+    for line in f:
+        # REFN des individus (même règle que l'ancienne passe dédiée)
+        if line.startswith('0 @I'):
+            refn_gid = line.split()[1].strip('@')
+        elif refn_gid and line.startswith('1 REFN'):
+            refn_parts = line.split()
+            if len(refn_parts) > 2:
+                refns.append((refn_gid, refn_parts[2].strip()))
+            refn_gid = None
+        
+        # Cas courant : niveau à un chiffre, découpe par partition (pas de liste)
+        text = line.strip()
+        c = text[:1]
+        if '0' <= c <= '9' and text[1:2] == ' ':
+            level = ord(c) - 48
+            tag, _, val = text[2:].partition(' ')
+        else:
+            parts = text.split(' ', 2)
+            if len(parts) < 2:
+                continue
+            level = int(parts[0])
+            tag = parts[1]
+            val = parts[2] if len(parts) > 2 else ""
         
         # Nouveau INDI
         if level == 0 and tag.startswith('@I'):
@@ -306,9 +413,9 @@ def scan_role_usage():
                 _analyze_role_usage(current_indi_id, current_event_name_norm, current_shars, role_usage)
             
             # Détecter si c'est un événement mappable
-            if tag in ['BIRT', 'DEAT', 'MARR', 'EVEN', 'FACT', 'OCCU', 'BAPM', 'BURI', 'CHR', 'CENS', 'GRAD', 'RESI']:
+            if tag in _SCAN_EVENT_TAGS:
                 current_event_tag = tag
-                current_event_type = val if tag in ['EVEN', 'FACT', 'OCCU'] else None
+                current_event_type = val if tag in _TYPED_EVENT_TAGS else None
                 current_shars = []
                 
                 # Déterminer le nom normalisé de l'événement
@@ -341,33 +448,7 @@ def scan_role_usage():
     if current_indi_id and current_shars and current_event_name_norm:
         _analyze_role_usage(current_indi_id, current_event_name_norm, current_shars, role_usage)
     
-    # --- CORRECTION ICI : La conversion se fait APRES la boucle principale ---
-    for r in role_usage.values():
-        if isinstance(r['events'], set):
-            r['events'] = sorted(list(r['events']))
-    
-    # Affichage résumé
-    log(f"✓ Roles detected: {len(role_usage)}")
-    
-    count_normal = sum(1 for r in role_usage.values() if r['normal'])
-    count_principal = sum(1 for r in role_usage.values() if r['principal'])
-    count_both = sum(1 for r in role_usage.values() if r['normal'] and r['principal'])
-    
-    log(f"  → 🟢 Used as witnesses: {count_normal}")
-    log(f"  → 🔴 Used as principals: {count_principal}")
-    log(f"  → 🟡 Both: {count_both}")
-    
-    # Afficher détails pour debug
-    for role_norm, data in sorted(role_usage.items()):
-        modes = []
-        if data['normal']: modes.append("🟢")
-        if data['principal']: modes.append("🔴")
-        events_str = ", ".join(data['events'][:3])
-        if len(data['events']) > 3:
-            events_str += f" (+{len(data['events'])-3} more)"
-        log(f"     {' '.join(modes)} {data['eng']:<20} → {events_str}")
-    
-    return role_usage
+    return role_usage, refns
 
 def _analyze_role_usage(owner_id, event_name_norm, shars, role_usage):
     """
@@ -377,12 +458,13 @@ def _analyze_role_usage(owner_id, event_name_norm, shars, role_usage):
         role_raw = shar['role']
         role_norm = normalize(role_raw)
         
-        # Initialiser si nouveau rôle
-        if role_norm not in role_usage:
+        # Entrée du rôle : une seule recherche, réutilisée ci-dessous
+        entry = role_usage.get(role_norm)
+        if entry is None:
             # Chercher labels dans ROLES_DB
             role_info = ROLES_DB.get(role_norm, {"eng": role_raw.title(), "fra": role_raw.title()})
             
-            role_usage[role_norm] = {
+            entry = role_usage[role_norm] = {
                 'normal': False,
                 'principal': False,
                 'eng': role_info['eng'],
@@ -391,16 +473,18 @@ def _analyze_role_usage(owner_id, event_name_norm, shars, role_usage):
             }
         
         # Ajouter l'événement
-        # Ceci ne plantera plus car on garantit que 'events' est un set ici
-        role_usage[role_norm]['events'].add(event_name_norm)
+        entry['events'].add(event_name_norm)
         
         # Déterminer si normal ou principal
         if shar['id'] == owner_id:
             # 🔴 Self-witness (Principal)
-            role_usage[role_norm]['principal'] = True
+            entry['principal'] = True
         else:
             # 🟢 Témoin tiers
-            role_usage[role_norm]['normal'] = True
+            entry['normal'] = True
+
+_ROLE_BLOCK_RE = re.compile(r'\[RL=(\d+)\](.*?)(?=\[RL=|\[:LABELS\]|$)', re.DOTALL)
+_ROLE_LABEL_RE = re.compile(r'(?:\[L=[^\]]+\])?([^\[\r\n]+)')
 
 def update_tmg_structure(role_usage):
     """
@@ -427,9 +511,6 @@ def update_tmg_structure(role_usage):
     t = dbf.Table(get_tmg_file("T"))
     t.open(dbf.READ_WRITE if not DRY_RUN else dbf.READ_ONLY)
     
-    regex_full_role = re.compile(r'\[RL=(\d+)\](.*?)(?=\[RL=|\[:LABELS\]|$)', re.DOTALL)
-    regex_lbl = re.compile(r'(?:\[L=[^\]]+\])?([^\[\r\n]+)')
-    
     modifications = []
     
     for rec in t:
@@ -452,11 +533,11 @@ def update_tmg_structure(role_usage):
         if "[LABELS:]" in sent:
             try:
                 labels_content = sent.split("[LABELS:]")[1].split("[:LABELS]")[0]
-                for m in regex_full_role.finditer(labels_content):
+                for m in _ROLE_BLOCK_RE.finditer(labels_content):
                     rid = int(m.group(1))
                     max_role_id = max(max_role_id, rid)
                     block = m.group(2)
-                    for lm in regex_lbl.finditer(block):
+                    for lm in _ROLE_LABEL_RE.finditer(block):
                         existing_roles[normalize(lm.group(1))] = rid
             except:
                 pass
@@ -566,6 +647,22 @@ def update_tmg_structure(role_usage):
     
     return event_ids, role_codes
 
+def _read_table_rows(path, names):
+    """
+    Enregistrements d'une table en tuples des champs `names` (None si absent).
+    Lecture mmap directe (dbf_fast) ; repli sur la librairie dbf si elle échoue.
+    """
+    try:
+        return dbf_fast.read_rows(path, names)
+    except Exception as e:
+        log(f"  (direct read unavailable for {os.path.basename(path)}: {e} - using dbf)")
+    
+    with dbf.Table(path) as t:
+        t.open(dbf.READ_ONLY)
+        present = set(dbf.field_names(t))
+        keys = [name.lower() for name in names]
+        return [tuple(r[k] if k in present else None for k in keys) for r in t]
+
 def load_persons_and_events():
     log("=" * 80)
     log("[3/5] MEMORY INDEXING ($.DBF, G.DBF, E.DBF)")
@@ -577,15 +674,13 @@ def load_persons_and_events():
     dsid = 1
     
     try:
-        with dbf.Table(get_tmg_file("$")) as t:
-            t.open(dbf.READ_ONLY)
-            for r in t:
-                if dsid == 1 and hasattr(r, 'dsid') and r.dsid > 0:
-                    dsid = r.dsid
-                if hasattr(r, 'reference'):
-                    ref = r.reference.strip()
-                    if ref:
-                        refn_to_perno[ref] = r.per_no
+        for r_dsid, r_ref, r_per_no in _read_table_rows(get_tmg_file("$"), ('dsid', 'reference', 'per_no')):
+            if dsid == 1 and r_dsid is not None and r_dsid > 0:
+                dsid = r_dsid
+            if r_ref is not None:
+                ref = r_ref.strip()
+                if ref:
+                    refn_to_perno[ref] = r_per_no
     except Exception as e:
         log(f"$.DBF Error: {e}", "ERROR")
         sys.exit(1)
@@ -599,25 +694,28 @@ def load_persons_and_events():
     event_count = 0
     
     try:
-        with dbf.Table(get_tmg_file("G")) as t:
-            t.open(dbf.READ_ONLY)
-            for r in t:
-                evt_data = {'recno': r.recno, 'edate': r.edate, 'per1': r.per1, 'per2': r.per2}
-                event_count += 1
-                
-                # Index PER1
-                if r.per1 > 0:
-                    key1 = (r.per1, r.etype)
-                    if key1 not in events_index:
-                        events_index[key1] = []
-                    events_index[key1].append(evt_data)
-                
-                # Index PER2 (pour mariages)
-                if r.per2 > 0:
-                    key2 = (r.per2, r.etype)
-                    if key2 not in events_index:
-                        events_index[key2] = []
-                    events_index[key2].append(evt_data)
+        for recno, edate, per1, per2, etype in _read_table_rows(
+                get_tmg_file("G"), ('recno', 'edate', 'per1', 'per2', 'etype')):
+            # Année TMG extraite une fois ici plutôt qu'à chaque témoin comparé
+            y_tmg = extract_year_tmg(edate)
+            if y_tmg == '0000':
+                y_tmg = None
+            evt_data = {'recno': recno, 'edate': edate, 'year': y_tmg, 'per1': per1, 'per2': per2}
+            event_count += 1
+            
+            # Index PER1
+            if per1 > 0:
+                key1 = (per1, etype)
+                if key1 not in events_index:
+                    events_index[key1] = []
+                events_index[key1].append(evt_data)
+            
+            # Index PER2 (pour mariages)
+            if per2 > 0:
+                key2 = (per2, etype)
+                if key2 not in events_index:
+                    events_index[key2] = []
+                events_index[key2].append(evt_data)
     except Exception as e:
         log(f"G.DBF Error: {e}", "ERROR")
         sys.exit(1)
@@ -630,19 +728,18 @@ def load_persons_and_events():
     existing_witnesses = set()
     
     try:
-        with dbf.Table(get_tmg_file("E")) as t:
-            t.open(dbf.READ_ONLY)
-            for r in t:
-                if r.gnum > 0 and r.eper > 0:
-                    # 1. Normalisation Rôle (int → "00003", "3" → "00003")
-                    role_norm = normalize_role_id(r.role)
-                    
-                    # 2. Normalisation Primary (Force en booléen Python)
-                    is_prim = bool(r.primary)
-                    
-                    # 3. Clé à 4 facteurs (GNUM, EPER, ROLE, PRIMARY)
-                    key = (r.gnum, r.eper, role_norm, is_prim)
-                    existing_witnesses.add(key)
+        for gnum, eper, role, primary in _read_table_rows(
+                get_tmg_file("E"), ('gnum', 'eper', 'role', 'primary')):
+            if gnum > 0 and eper > 0:
+                # 1. Normalisation Rôle (int → "00003", "3" → "00003")
+                role_norm = normalize_role_id(role)
+                
+                # 2. Normalisation Primary (Force en booléen Python)
+                is_prim = bool(primary)
+                
+                # 3. Clé à 4 facteurs (GNUM, EPER, ROLE, PRIMARY)
+                key = (gnum, eper, role_norm, is_prim)
+                existing_witnesses.add(key)
     except Exception as e:
         log(f"E.DBF Error: {e}", "ERROR")
         sys.exit(1)
@@ -653,16 +750,22 @@ def load_persons_and_events():
     log("  → Mapping GEDCOM → TMG...")
     ged_to_perno = {}
     
-    with open(GEDCOM_PATH, 'r', encoding='ansi') as f:
-        gid = None
-        for line in f:
-            if line.startswith('0 @I'):
-                gid = line.split()[1].strip('@')
-            elif line.startswith('1 REFN') and gid:
-                refn = line.split()[2].strip()
-                if refn in refn_to_perno:
-                    ged_to_perno[gid] = refn_to_perno[refn]
-                gid = None
+    if GEDCOM_REFNS and GEDCOM_REFNS[0] == GEDCOM_PATH:
+        # REFN déjà relevés pendant la passe 1
+        for gid, refn in GEDCOM_REFNS[1]:
+            if refn in refn_to_perno:
+                ged_to_perno[gid] = refn_to_perno[refn]
+    else:
+        with open(GEDCOM_PATH, 'r', encoding='ansi', buffering=GEDCOM_READ_BUFFER) as f:
+            gid = None
+            for line in f:
+                if line.startswith('0 @I'):
+                    gid = line.split()[1].strip('@')
+                elif line.startswith('1 REFN') and gid:
+                    refn = line.split()[2].strip()
+                    if refn in refn_to_perno:
+                        ged_to_perno[gid] = refn_to_perno[refn]
+                    gid = None
     
     log(f"  ✓ {len(ged_to_perno)} GEDCOM persons mapped")
     log("=" * 80)
@@ -677,6 +780,14 @@ def inject_witnesses(evt_ids, role_codes, ged_to_perno, dsid, events_index, exis
     if DRY_RUN:
         log("⚠️  SIMULATION MODE - No data will be saved", "DRYRUN")
     
+    # SEQUENCE max par événement : une lecture d'E.DBF au lieu d'un scan par témoin
+    global _SEQ_BY_GNUM
+    _SEQ_BY_GNUM = {}
+    if not DRY_RUN:
+        for gnum, sequence in _read_table_rows(get_tmg_file("E"), ('gnum', 'sequence')):
+            if sequence > _SEQ_BY_GNUM.get(gnum, 0):
+                _SEQ_BY_GNUM[gnum] = sequence
+    
     tw = dbf.Table(get_tmg_file("E"))
     tw.open(dbf.READ_WRITE if not DRY_RUN else dbf.READ_ONLY)
     
@@ -684,7 +795,7 @@ def inject_witnesses(evt_ids, role_codes, ged_to_perno, dsid, events_index, exis
     last_logged = 0
     
     # Parser le GEDCOM par blocs (@I et @F)
-    with open(GEDCOM_PATH, 'r', encoding='ansi') as f:
+    with open(GEDCOM_PATH, 'r', encoding='ansi', buffering=GEDCOM_READ_BUFFER) as f:
         block = []
         for line in f:
             # Détecter début de bloc INDI ou FAM
@@ -843,31 +954,22 @@ def flush_event(evt_ctx, pper, evt_ids, role_codes, ged_to_perno, events_index,
     # Chercher l'événement dans G.DBF via l'index RAM
     candidates = events_index.get((pper, evt_ctx['eid']), [])
     
-    target_gnum = None
+    # Si TMG a une année valide (pré-extraite à l'indexation), elle doit matcher GEDCOM
+    target = None
     for cand in candidates:
-        match = True
-        if y_ged:
-            y_tmg = extract_year_tmg(cand['edate'])
-            # Si TMG a une année valide, elle doit matcher GEDCOM
-            if y_tmg and y_tmg != '0000' and y_tmg != y_ged:
-                match = False
-        
-        if match:
-            target_gnum = cand['recno']
+        y_tmg = cand['year']
+        if not (y_ged and y_tmg and y_tmg != y_ged):
+            target = cand
             break
     
-    if not target_gnum:
+    if not target or not target['recno']:
         stats['error'] += len(evt_ctx['witnesses'])
         return
     
-    # Récupérer PER1/PER2 du candidat pour le check anti-auto-référence
-    target_per1 = 0
-    target_per2 = 0
-    for cand in candidates:
-        if cand['recno'] == target_gnum:
-            target_per1 = cand.get('per1', 0)
-            target_per2 = cand.get('per2', 0)
-            break
+    # PER1/PER2 du candidat retenu pour le check anti-auto-référence
+    target_gnum = target['recno']
+    target_per1 = target.get('per1', 0)
+    target_per2 = target.get('per2', 0)
     
     # Injecter chaque témoin
     for wit in evt_ctx['witnesses']:
@@ -944,15 +1046,11 @@ def insert_single_witness(wit_data, eid, gnum, role_codes, ged_to_perno, existin
     
     # --- FIN GARDE-FOU ---
     
-    # Calculer SEQUENCE
+    # Calculer SEQUENCE (index en mémoire construit par inject_witnesses)
     if DRY_RUN:
         new_seq = 1
     else:
-        max_seq = 0
-        for row in tw:
-            if row.gnum == gnum and row.sequence > max_seq:
-                max_seq = row.sequence
-        new_seq = max_seq + 1
+        new_seq = _SEQ_BY_GNUM.get(gnum, 0) + 1
     
     # ✅ INJECTION avec PRIMARY flag
     try:
@@ -966,6 +1064,7 @@ def insert_single_witness(wit_data, eid, gnum, role_codes, ged_to_perno, existin
                 'ROLE': role_formatted,
                 'WITMEMO': memo[:60000]
             })
+            _SEQ_BY_GNUM[gnum] = new_seq
         
         # Ajouter au cache RAM
         existing_witnesses.add(check_key)
@@ -992,18 +1091,20 @@ def save_config(gedcom_path, pjc_path, tmg_prefix):
         'last_used': datetime.now().isoformat()
     }
     try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
+        if orjson:
+            with open(CONFIG_FILE, 'wb') as f:
+                f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+        else:
+            with open(CONFIG_FILE, 'w') as f:
+                json.dump(config, f, indent=2)
     except:
         pass
 
 def load_config():
-    if not os.path.exists(CONFIG_FILE):
-        return None
     try:
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
-    except:
+        return _load_json(CONFIG_FILE)
+    except (OSError, ValueError):
+        # Fichier absent/illisible ou JSON invalide
         return None
 
 def ask_use_last_config():
@@ -1320,8 +1421,7 @@ def inject_roles_mode(gedcom_path, tmg_project_path, tmg_prefix,
     
     # Charger mapping
     try:
-        with open(mapping_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _load_json(mapping_file)
         
         # Extraire les valeurs correctement (comme dans load_mapping)
         EVENT_MAPPING = {}
@@ -14,6 +14,7 @@ NOUVEAU v5.0:
 
 Usage:
   python sentence_injector.py   →  Mode interactif
+  python sentence_injector.py --pjc PROJET.PJC --inject-all --yes   →  Sans menu ni questions
 
 Auteur: Claude
 Date: 2026-02-06
@@ -23,10 +24,13 @@ Version: 5.0
 import sys
 import os
 import re
-import shutil
+import argparse
 from datetime import datetime
 import platform
-import subprocess
+import functools
+
+from dbf_fast import DBFMmap, copy_files
+from tmg_process import is_tmg_running
 
 try:
     import dbf
@@ -44,39 +48,7 @@ TMG_PATH = None
 TMG_PREFIX = None
 LOG_CALLBACK = None  # Callback optionnel pour logs vers GUI
 LANGUAGE = 'EN'  # Langue par défaut (EN ou FR)
-
-# =============================================================================
-# UTILITY FUNCTIONS
-# =============================================================================
-def is_tmg_running():
-    """
-    Vérifie si The Master Genealogist est en cours d'exécution.
-    Supporte TMG v7, v8, v9 (tmg7.exe, tmg8.exe, tmg9.exe).
-    
-    CRITIQUE : Modifier les fichiers DBF pendant que TMG est ouvert peut causer
-    une corruption de base de données.
-    
-    Returns:
-        bool: True si un processus TMG est détecté
-    """
-    if platform.system() == 'Windows':
-        try:
-            # Vérifier les 3 versions possibles
-            for exe_name in ['tmg9.exe', 'tmg8.exe', 'tmg7.exe']:
-                result = subprocess.run(
-                    ['tasklist', '/FI', f'IMAGENAME eq {exe_name}'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if exe_name in result.stdout:
-                    return True
-            return False
-        except Exception as e:
-            # Si la vérification échoue, on continue (mieux que bloquer)
-            print(f"⚠️  Warning: Cannot check if TMG is running: {e}")
-            return False
-    return False  # Sur non-Windows, on assume que c'est OK
+_DEBUG = False  # Traces de diagnostic (analyze_tag_mode)
 
 # =============================================================================
 # TRADUCTIONS
@@ -107,6 +79,8 @@ TEXTS = {
         'custom_tags_found': 'custom tag(s) found',
         'no_custom_tags': 'No custom tags found',
         'goodbye': 'Goodbye!',
+        'project_locked': 'This project is already open in another injection session',
+        'project_unopenable': 'Cannot open the project file',
         'invalid_choice': 'Invalid choice',
         'cancelled': 'Cancelled',
         
@@ -213,6 +187,8 @@ TEXTS = {
         'custom_tags_found': 'tag(s) custom trouvé(s)',
         'no_custom_tags': 'Aucun tag custom trouvé',
         'goodbye': 'Au revoir !',
+        'project_locked': 'Ce projet est déjà ouvert dans une autre session d\'injection',
+        'project_unopenable': 'Impossible d\'ouvrir le fichier du projet',
         'invalid_choice': 'Choix invalide',
         'cancelled': 'Annulé',
         
@@ -300,6 +276,11 @@ def t(key):
     """Retourne le texte traduit selon la langue courante"""
     return TEXTS.get(LANGUAGE, TEXTS['EN']).get(key, key)
 
+# Textes de la boucle de menu CLI, résolus une seule fois par ask_language()
+MENU_KEYS = ('menu_choice', 'submenu_choice', 'invalid_choice', 'number',
+             'custom_tags_list', 'goodbye')
+MENU_STRINGS = {}
+
 def ask_language():
     """Demande la langue au démarrage (CLI uniquement)"""
     print("\n" + "="*50)
@@ -311,12 +292,13 @@ def ask_language():
     
     choice = input("Language / Langue (1-2): ").strip()
     
+    return set_language('FR' if choice == '2' else 'EN')
+
+def set_language(language):
+    """Fixe la langue de l'interface ('EN' ou 'FR') et les textes du menu"""
     global LANGUAGE
-    if choice == '2':
-        LANGUAGE = 'FR'
-    else:
-        LANGUAGE = 'EN'
-    
+    LANGUAGE = language
+    MENU_STRINGS.update({k: t(k) for k in MENU_KEYS})
     return LANGUAGE
 
 def log(message, level='INFO'):
@@ -383,35 +365,91 @@ def get_tmg_file(suffix):
     """Construit chemin fichier TMG"""
     return os.path.join(TMG_PATH, f"{TMG_PREFIX}{suffix}.DBF")
 
+# Octet verrouillé sous Windows : au-delà des données et de la zone de verrous VFP
+_SESSION_LOCK_OFFSET = 0xFFFFFFF0
+
+def _lock_session(t_dbf_path):
+    """
+    Verrou exclusif non bloquant sur T.DBF pour la durée de la session CLI.
+    
+    Windows : msvcrt.locking sur un octet hors des données, donc sans gêner
+    les écritures de dbf. POSIX : fcntl.flock (consultatif).
+    
+    Un T.DBF en lecture seule est ouvert en lecture : le verrou se pose
+    aussi sur ce descripteur (les écritures échoueront ensuite d'elles-mêmes).
+    
+    Returns:
+        int | None: descripteur à passer à _unlock_session, None (message
+        affiché) si le fichier ne s'ouvre pas ou si le projet est déjà
+        verrouillé par une autre session
+    """
+    binary = getattr(os, 'O_BINARY', 0)
+    try:
+        try:
+            fd = os.open(t_dbf_path, os.O_RDWR | binary)
+        except PermissionError:
+            fd = os.open(t_dbf_path, os.O_RDONLY | binary)
+    except OSError as e:
+        log(f"\n⛔ {t('project_unopenable')} : {t_dbf_path} ({e})", 'ERROR')
+        return None
+    
+    try:
+        if platform.system() == 'Windows':
+            import msvcrt
+            os.lseek(fd, _SESSION_LOCK_OFFSET, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        log(f"\n⛔ {t('project_locked')} : {t_dbf_path}", 'ERROR')
+        return None
+    return fd
+
+def _unlock_session(fd):
+    """Libère le verrou posé par _lock_session"""
+    try:
+        if platform.system() == 'Windows':
+            import msvcrt
+            os.lseek(fd, _SESSION_LOCK_OFFSET, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
 # =============================================================================
 # BACKUP
 # =============================================================================
 def create_backup():
     """Crée backup complet (DBF + FPT + CDX)"""
-    t_dbf_path = get_tmg_file("T")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    if not os.path.exists(t_dbf_path):
-        log(f"Fichier introuvable : {t_dbf_path}", 'ERROR')
+    # {nom source en minuscules: nom du backup}
+    wanted = {
+        f"{TMG_PREFIX}T.{ext}".lower(): f"{TMG_PREFIX}T_BACKUP_{timestamp}.{ext}"
+        for ext in ('dbf', 'fpt', 'cdx')
+    }
+    
+    # Une seule lecture du dossier (casse ignorée, comme sous Windows)
+    # au lieu d'un exists par fichier
+    try:
+        with os.scandir(TMG_PATH) as entries:
+            found = [(entry.path, wanted[entry.name.lower()]) for entry in entries
+                     if entry.name.lower() in wanted and entry.is_file()]
+    except OSError:
+        found = []
+    
+    if not any(backup_name.endswith('.dbf') for _, backup_name in found):
+        log(f"Fichier introuvable : {get_tmg_file('T')}", 'ERROR')
         return None
     
     backup_dir = os.path.join(TMG_PATH, "BACKUPS_SENTENCES")
     os.makedirs(backup_dir, exist_ok=True)
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    files_to_backup = [
-        (f"{TMG_PREFIX}T.dbf", f"{TMG_PREFIX}T_BACKUP_{timestamp}.dbf"),
-        (f"{TMG_PREFIX}T.fpt", f"{TMG_PREFIX}T_BACKUP_{timestamp}.fpt"),
-        (f"{TMG_PREFIX}T.cdx", f"{TMG_PREFIX}T_BACKUP_{timestamp}.cdx")
-    ]
-    
     try:
-        for src_file, backup_name in files_to_backup:
-            src_path = os.path.join(TMG_PATH, src_file)
-            
-            if os.path.exists(src_path):
-                backup_path = os.path.join(backup_dir, backup_name)
-                shutil.copy2(src_path, backup_path)
+        # DBF, FPT et CDX copiés en parallèle
+        copy_files((src_path, os.path.join(backup_dir, backup_name))
+                   for src_path, backup_name in found)
         
         log(f"✅ Backup créé : {backup_dir}", 'SUCCESS')
         return backup_dir
@@ -423,73 +461,122 @@ def create_backup():
 # =============================================================================
 # PARSING TSENTENCE
 # =============================================================================
+# Regex compilées une fois au chargement du module
+# [RL=00001][L=ENGLISH]Name[L=FRENCH]Nom
+_ROLE_LABEL_RE = re.compile(r'\[L=([^\]]+)\]([^\[]+)')
+# Marqueur de langue [L=...] (groupe capturant : conservé par split)
+_LANG_SPLIT_RE = re.compile(r'(\[L=[^\]]+\])')
+_LANG_MARKER_RE = re.compile(r'\[L=([^\]]+)\]')
+
+_LANG_KEYS = {}  # Clés de langue partagées ('ENGLISH', 'FRENCH', ...) entre tous les parsings
+
+def _lang_key(raw):
+    """Nom de langue en majuscules, même objet str à chaque occurrence"""
+    key = raw.upper()
+    return _LANG_KEYS.setdefault(key, key)
+
+def _iter_id_blocks(text, marker, stops):
+    """
+    (id, contenu) pour chaque `marker`NNNNN] de text, le contenu allant
+    jusqu'au premier des marqueurs `stops` ou à la fin (str.find sur des
+    littéraux, sans regex non-gourmande à lookahead).
+    
+    [RL=..] : stops=('[RL=',)         ; [R=..] : stops=('[R=', '[L=')
+    (pas [^\[] car les phrases contiennent [P], [M], [D], [L] !)
+    """
+    skip = len(marker)
+    pos = text.find(marker)
+    while pos != -1:
+        start = pos + skip
+        close = text.find(']', start)
+        digits = text[start:close] if close != -1 else ''
+        if not digits.isdecimal():
+            pos = text.find(marker, start)
+            continue
+        
+        end = len(text)
+        for stop in stops:
+            i = text.find(stop, close + 1, end)
+            if i != -1:
+                end = i
+        yield int(digits), text[close + 1:end]
+        pos = text.find(marker, end)
+
 def parse_tsentence(tsentence_str):
     """
     Parse le champ TSENTENCE pour extraire rôles et phrases
     Format TMG : [L=LANG] suivi de [R=00001]phrase [R=00002]phrase
+    
+    Le parsing est mémorisé par contenu ; chaque appel reçoit une copie
+    modifiable (inject_* réécrit data['phrase'] en place).
     """
+    return {rid: {'role': dict(data['role']), 'phrase': dict(data['phrase'])}
+            for rid, data in _parse_tsentence_cached(tsentence_str).items()}
+
+@functools.lru_cache(maxsize=1024)
+def _parse_tsentence_cached(tsentence_str):
+    """Parsing effectif de TSENTENCE (résultat partagé, ne pas modifier)"""
     roles_data = {}
     
+    # Un seul passage par marqueur : [LABELS:] puis [:LABELS]
+    _, opened, rest = tsentence_str.partition('[LABELS:]')
+    labels_section, closed, phrases_section = (rest if opened else tsentence_str).partition('[:LABELS]')
+    
     # 1. Parser les RÔLES dans [LABELS:]..[:LABELS]
-    if '[LABELS:]' in tsentence_str and '[:LABELS]' in tsentence_str:
-        labels_section = tsentence_str.split('[LABELS:]')[1].split('[:LABELS]')[0]
-        
-        # [RL=00001][L=ENGLISH]Name[L=FRENCH]Nom
-        regex_role = re.compile(r'\[RL=(\d+)\](.*?)(?=\[RL=|$)', re.DOTALL)
-        regex_lbl = re.compile(r'\[L=([^\]]+)\]([^\[]+)')
-        
-        for m in regex_role.finditer(labels_section):
-            rid = int(m.group(1))
-            block = m.group(2)
-            
-            if rid not in roles_data:
-                roles_data[rid] = {'role': {}, 'phrase': {}}
+    if opened and closed:
+        for rid, block in _iter_id_blocks(labels_section, '[RL=', ('[RL=',)):
+            entry = roles_data.get(rid)
+            if entry is None:
+                entry = roles_data[rid] = {'role': {}, 'phrase': {}}
             
-            for lm in regex_lbl.finditer(block):
-                lang = lm.group(1).upper()
-                text = lm.group(2).strip()
-                roles_data[rid]['role'][lang] = text
+            role = entry['role']
+            for lm in _ROLE_LABEL_RE.finditer(block):
+                role[_lang_key(lm.group(1))] = lm.group(2).strip()
     
     # 2. Parser les PHRASES - par blocs de langue [L=...]
-    # Les phrases sont APRÈS [:LABELS]
-    if '[:LABELS]' in tsentence_str:
-        phrases_section = tsentence_str.split('[:LABELS]')[1]
-    else:
+    # Les phrases sont APRÈS [:LABELS] (tout le champ s'il n'y en a pas)
+    if not closed:
         phrases_section = tsentence_str
     
     # Découper par marqueurs de langue [L=...]
-    lang_blocks = re.split(r'(\[L=[^\]]+\])', phrases_section)
+    lang_blocks = _LANG_SPLIT_RE.split(phrases_section)
     current_lang = None
     
     for block in lang_blocks:
         # Si c'est un marqueur de langue [L=FRENCH]
         if block.startswith('[L='):
-            m = re.match(r'\[L=([^\]]+)\]', block)
+            m = _LANG_MARKER_RE.match(block)
             if m:
-                current_lang = m.group(1).upper()
+                current_lang = _lang_key(m.group(1))
                 if current_lang == 'ENGLISH':
                     current_lang = 'ENGLISHUK'
         # Sinon c'est du contenu avec des [R=...]
         elif current_lang and block.strip():
             # CORRECTION : Capturer jusqu'au prochain [R= ou [L= ou fin
-            # Pas [^\[] car les phrases contiennent [P], [M], [D], [L] !
-            regex_phrase = re.compile(r'\[R=(\d+)\](.*?)(?=\[R=|\[L=|$)', re.DOTALL)
-            for m in regex_phrase.finditer(block):
-                rid = int(m.group(1))
-                text = m.group(2).strip()
+            for rid, text in _iter_id_blocks(block, '[R=', ('[R=', '[L=')):
+                text = text.strip()
                 
                 if text:  # Seulement si phrase non vide
-                    if rid not in roles_data:
-                        roles_data[rid] = {'role': {}, 'phrase': {}}
-                    roles_data[rid]['phrase'][current_lang] = text
+                    entry = roles_data.get(rid)
+                    if entry is None:
+                        entry = roles_data[rid] = {'role': {}, 'phrase': {}}
+                    entry['phrase'][current_lang] = text
     
     return roles_data
 
 # =============================================================================
 # GÉNÉRATION DE PHRASES
 # =============================================================================
+def _is_principal(role_name):
+    """
+    Vrai si le nom du rôle contient 'principal' (ex: "Principal Buyer",
+    "Co-Principal") : règle unique pour l'aperçu GUI et l'injection.
+    """
+    return 'principal' in role_name.lower()
+
+@functools.lru_cache(maxsize=4096)
 def generate_phrase(tag_name, role_name, is_principal=False):
-    """Génère phrases EN et FR pour un rôle"""
+    """Génère phrases EN et FR pour un rôle (mémorisé : aperçu GUI puis injection)"""
     tag_lower = tag_name.lower()
     role_lower = role_name.lower()
     
@@ -533,65 +620,127 @@ def rebuild_tsentence(roles_data):
     CRITIQUE : LABELS D'ABORD, puis PHRASES !
     """
     
-    # 1. Construire [LABELS:] EN PREMIER
-    labels_part = "[LABELS:]\r\n"
+    # Morceaux accumulés en liste, joints une seule fois à la fin
+    parts = ["[LABELS:]\r\n"]
+    
+    # Ordre des rôles trié une fois pour les deux sections
+    rids = sorted(roles_data)
     
-    for rid in sorted(roles_data.keys()):
+    # 1. Construire [LABELS:] EN PREMIER
+    for rid in rids:
         data = roles_data[rid]
         if data['role']:
-            rl_block = f"[RL={rid:05d}]"
-            for lang, text in sorted(data['role'].items()):
-                rl_block += f"[L={lang}]{text}"
-            labels_part += rl_block + "\r\n"
+            parts.append(f"[RL={rid:05d}]")
+            parts.extend(f"[L={lang}]{text}" for lang, text in sorted(data['role'].items()))
+            parts.append("\r\n")
     
-    labels_part += "[:LABELS]\r\n"
+    parts.append("[:LABELS]\r\n")
     
     # 2. Construire les PHRASES groupées par langue (EN SECOND)
     phrases_blocks = {}
     
-    for rid in sorted(roles_data.keys()):
+    for rid in rids:
         data = roles_data[rid]
         if data['phrase']:
+            # Préfixe formaté une seule fois par rôle, réutilisé pour chaque langue
+            r_prefix = f"[R={rid:05d}]"
             for lang, text in data['phrase'].items():
                 if lang == 'ENGLISH':
                     lang = 'ENGLISHUK'
                 
                 if lang not in phrases_blocks:
                     phrases_blocks[lang] = []
-                phrases_blocks[lang].append(f"[R={rid:05d}]{text}")
+                phrases_blocks[lang].append(r_prefix + text)
     
     # Construire section phrases
-    phrases_part = ""
-    
     all_langs = set(phrases_blocks.keys())
     if 'ENGLISHUK' not in all_langs and 'ENGLISH' not in all_langs:
         all_langs.add('ENGLISHUK')
     
-    for lang in sorted(list(all_langs)):
-        phrases_part += f"[L={lang}]"
-        if lang in phrases_blocks:
-            phrases_part += "".join(phrases_blocks[lang])
-        phrases_part += "\r\n"
+    for lang in sorted(all_langs):
+        parts.append(f"[L={lang}]")
+        parts.extend(phrases_blocks.get(lang, ()))
+        parts.append("\r\n")
     
     # ASSEMBLAGE CRITIQUE : LABELS D'ABORD, PUIS PHRASES !
-    return labels_part + phrases_part
+    return "".join(parts)
 
 # =============================================================================
 # LECTURE TAGS CUSTOM
 # =============================================================================
+# Cache des tags custom : {chemin T.DBF: (signature fichiers, tags)}
+# La signature (mtime + taille du .DBF et du .FPT) change dès qu'une phrase
+# est écrite, ce qui invalide automatiquement l'entrée.
+_TAG_CACHE = {}
+
+def _tag_cache_signature(t_dbf_path):
+    """Signature (mtime_ns, taille) du T.DBF et de son mémo .FPT"""
+    signature = []
+    for path in (t_dbf_path, os.path.splitext(t_dbf_path)[0] + '.FPT'):
+        try:
+            st = os.stat(path)
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append((st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
 def list_custom_tags():
-    """Liste tous les tags custom"""
+    """Liste tous les tags custom (relu seulement si T.DBF a changé)"""
     t_dbf_path = get_tmg_file("T")
     
     if not os.path.exists(t_dbf_path):
         log(f"Fichier introuvable : {t_dbf_path}", 'ERROR')
         return []
     
+    signature = _tag_cache_signature(t_dbf_path)
+    cached = _TAG_CACHE.get(t_dbf_path)
+    if cached and cached[0] == signature:
+        return list(cached[1])
+    
+    try:
+        # Chemin rapide : T.DBF/T.FPT mappés en mémoire
+        custom_tags = _scan_custom_tags_mmap(t_dbf_path)
+    except Exception as e:
+        if _DEBUG:
+            print(f"DEBUG: lecture directe impossible ({e}), repli sur dbf")
+        custom_tags = None
+    
+    if custom_tags is None:
+        custom_tags = _scan_custom_tags_dbf(t_dbf_path)
+        if custom_tags is None:
+            custom_tags = []
+            signature = None  # Lecture incomplète : ne pas mettre en cache
+    
+    # Tri alphabétique par nom
+    custom_tags.sort(key=lambda x: x['ETYPENAME'].upper())
+    
+    if signature is not None:
+        _TAG_CACHE[t_dbf_path] = (signature, custom_tags)
+    return list(custom_tags)
+
+def _scan_custom_tags_mmap(t_dbf_path):
+    """Scan des tags custom directement dans le tampon mappé"""
+    custom_tags = []
+    with DBFMmap(t_dbf_path) as table:
+        for recno, off in enumerate(table.record_offsets()):
+            # Même filtre que _scan_custom_tags_dbf
+            if table.value(off, 'ORIGETYPE') == 0 and table.value(off, 'ETYPENUM') > 1123:
+                custom_tags.append({
+                    'ETYPENAME': table.value(off, 'ETYPENAME').strip(),
+                    'ETYPENUM': table.value(off, 'ETYPENUM'),
+                    'TSENTENCE': table.value(off, 'TSENTENCE'),
+                    'RECNO': recno
+                })
+    return custom_tags
+
+def _scan_custom_tags_dbf(t_dbf_path):
+    """Scan des tags custom via la librairie dbf (None si erreur)"""
     custom_tags = []
     
     try:
         with dbf.Table(t_dbf_path, codepage='cp1252') as table:
-            for record in table:
+            for recno, record in enumerate(table):
                 # Filtre: ORIGETYPE == 0 ET ETYPENUM > 1123
                 # <= 1123 = Tags standard TMG (ne pas toucher)
                 # > 1123 = Tags custom utilisateur (modifiables)
@@ -599,13 +748,12 @@ def list_custom_tags():
                     custom_tags.append({
                         'ETYPENAME': record['ETYPENAME'].strip(),
                         'ETYPENUM': record['ETYPENUM'],
-                        'TSENTENCE': record['TSENTENCE']
+                        'TSENTENCE': record['TSENTENCE'],
+                        'RECNO': recno
                     })
     except Exception as e:
         log(f"Erreur lecture tags : {e}", 'ERROR')
-    
-    # Tri alphabétique par nom
-    custom_tags.sort(key=lambda x: x['ETYPENAME'].upper())
+        return None
     
     return custom_tags
 
@@ -716,33 +864,58 @@ def inject_single_tag(tag, override=False, interactive=True):
             log("❌ Annulé", 'ERROR')
             return False
     
+    # Rôles à traiter et leurs phrases, calculés une fois pour l'aperçu,
+    # la confirmation et l'injection : (rid, data, rôle, EN, FR)
+    targets = []
+    for rid, data in sorted(roles_data.items()):
+        if not data['phrase'] or override:
+            role_name = data['role'].get('ENGLISH', 'Unknown')
+            phrase_en, phrase_fr = generate_phrase(tag_name, role_name, _is_principal(role_name))
+            targets.append((rid, data, role_name, phrase_en, phrase_fr))
+    
     # Aperçu des phrases
     log("\n📝 APERÇU DES PHRASES :")
     log("-"*80)
     
-    for rid, data in sorted(roles_data.items()):
-        if not data['phrase'] or override:
-            role_name = data['role'].get('ENGLISH', 'Unknown')
-            is_principal = 'principal' in role_name.lower()
-            
-            phrase_en, phrase_fr = generate_phrase(tag_name, role_name, is_principal)
-            
-            action = "RÉGÉNÉRER" if (data['phrase'] and override) else "INJECTER"
-            log(f"  [{rid:05d}] {role_name} [{action}]")
-            log(f"         EN → {phrase_en}")
-            log(f"         FR → {phrase_fr}")
-            log("")
+    for rid, data, role_name, phrase_en, phrase_fr in targets:
+        action = "RÉGÉNÉRER" if (data['phrase'] and override) else "INJECTER"
+        log(f"  [{rid:05d}] {role_name} [{action}]")
+        log(f"         EN → {phrase_en}")
+        log(f"         FR → {phrase_fr}")
+        log("")
     
     log("-"*80)
     
     # Confirmation (mode CLI uniquement)
     if interactive:
-        total_to_modify = sum(1 for d in roles_data.values() if not d['phrase'] or override)
-        confirm = input(f"\nModifier {total_to_modify} phrase(s) ? (O/n) : ").strip().lower()
+        confirm = input(f"\nModifier {len(targets)} phrase(s) ? (O/n) : ").strip().lower()
         if confirm not in ['o', 'oui', 'y', 'yes', '']:
             log("❌ Annulé", 'ERROR')
             return False
     
+    # Écrire les phrases générées
+    injected = 0
+    replaced = 0
+    
+    for rid, data, role_name, phrase_en, phrase_fr in targets:
+        if data['phrase']:
+            replaced += 1
+        else:
+            injected += 1
+        
+        # FIX: Vider le dict avant d'écrire pour vraiment overwrite
+        data['phrase'] = {}
+        data['phrase']['ENGLISH'] = phrase_en
+        data['phrase']['FRENCH'] = phrase_fr
+    
+    # Reconstruire TSENTENCE
+    new_tsentence = rebuild_tsentence(roles_data)
+    
+    # Idempotence : TSENTENCE identique => ni backup ni écriture
+    if new_tsentence.rstrip() == (tag['TSENTENCE'] or '').rstrip():
+        log(f"\n✅ Tag déjà à jour : {tag_name} (aucune écriture)", 'SUCCESS')
+        return True
+    
     # BACKUP
     log("\n🔄 Création backup automatique...")
     backup_path = create_backup()
@@ -750,61 +923,89 @@ def inject_single_tag(tag, override=False, interactive=True):
         log("❌ Backup échoué - ARRÊT", 'ERROR')
         return False
     
-    # Générer phrases
-    injected = 0
-    replaced = 0
+    # Écrire dans DBF (accès direct à l'enregistrement relevé par list_custom_tags)
+    write_errors = _write_pending_tsentences(
+        {etypenum: (0, tag_name, new_tsentence, injected, replaced, tag.get('RECNO'))},
+        backup_path)
     
-    for rid, data in roles_data.items():
-        if not data['phrase'] or override:
-            role_name = data['role'].get('ENGLISH', 'Unknown')
-            is_principal = 'principal' in role_name.lower()
-            
-            phrase_en, phrase_fr = generate_phrase(tag_name, role_name, is_principal)
-            
-            if data['phrase']:
-                replaced += 1
-            else:
-                injected += 1
-            
-            # FIX: Vider le dict avant d'écrire pour vraiment overwrite
-            data['phrase'] = {}
-            data['phrase']['ENGLISH'] = phrase_en
-            data['phrase']['FRENCH'] = phrase_fr
+    if write_errors:
+        log(f"\n❌ ERREUR : {write_errors[etypenum]}", 'ERROR')
+        log(f"   Backup disponible : {backup_path}", 'INFO')
+        return False
     
-    # Reconstruire TSENTENCE
-    new_tsentence = rebuild_tsentence(roles_data)
+    log(f"\n✅ Tag mis à jour : {tag_name}", 'SUCCESS')
+    if injected > 0:
+        log(f"   → {injected} phrase(s) injectée(s)", 'SUCCESS')
+    if replaced > 0:
+        log(f"   → {replaced} phrase(s) régénérée(s)", 'SUCCESS')
+    
+    log("\n⚠️  IMPORTANT : Ouvrez TMG et lancez", 'WARNING')
+    log("   File > Maintenance > Reindex", 'WARNING')
     
-    # Écrire dans DBF
+    return True
+
+# =============================================================================
+# INJECTION EN MASSE
+# =============================================================================
+def _write_pending_tsentences(pending, backup_path):
+    """
+    Écrit un lot de TSENTENCE en une seule ouverture de T.DBF
+    
+    pending : {ETYPENUM: (idx, nom, tsentence, injectées, régénérées, recno)}
+    Les enregistrements sont atteints directement par recno (relevé par
+    list_custom_tags) ; scan séquentiel seulement pour ceux qui ont bougé.
+    Retourne {ETYPENUM: erreur} pour les tags non écrits
+    """
+    write_errors = {}
+    to_write = dict(pending)
     t_dbf_path = get_tmg_file("T")
     
     try:
         with dbf.Table(t_dbf_path, codepage='cp1252') as table:
-            for record in table:
-                if record['ETYPENUM'] == etypenum:
+            num_records = len(table)
+            # Ordre physique des enregistrements : accès séquentiel à T.DBF/T.FPT
+            by_position = sorted(to_write.items(),
+                                 key=lambda item: -1 if item[1][5] is None else item[1][5])
+            for etypenum, entry in by_position:
+                recno = entry[5]
+                if recno is None or recno >= num_records:
+                    continue
+                record = table[recno]
+                if record['ETYPENUM'] != etypenum:
+                    continue  # Table modifiée depuis la lecture : scan ci-dessous
+                del to_write[etypenum]
+                try:
                     with record:
-                        record['TSENTENCE'] = new_tsentence
+                        record['TSENTENCE'] = entry[2]
+                except Exception as e:
+                    write_errors[etypenum] = e
+            
+            for record in (table if to_write else ()):
+                entry = to_write.pop(record['ETYPENUM'], None)
+                if entry is None:
+                    continue
+                try:
+                    with record:
+                        record['TSENTENCE'] = entry[2]
+                except Exception as e:
+                    write_errors[record['ETYPENUM']] = e
+                if not to_write:
                     break
-        
-        log(f"\n✅ Tag mis à jour : {tag_name}", 'SUCCESS')
-        if injected > 0:
-            log(f"   → {injected} phrase(s) injectée(s)", 'SUCCESS')
-        if replaced > 0:
-            log(f"   → {replaced} phrase(s) régénérée(s)", 'SUCCESS')
-        
-        log("\n⚠️  IMPORTANT : Ouvrez TMG et lancez", 'WARNING')
-        log("   File > Maintenance > Reindex", 'WARNING')
-        
-        return True
-    
     except Exception as e:
-        log(f"\n❌ ERREUR : {e}", 'ERROR')
+        log(f"❌ ERREUR écriture : {e}", 'ERROR')
         log(f"   Backup disponible : {backup_path}", 'INFO')
-        return False
+        for etypenum in to_write:
+            write_errors[etypenum] = e
+        to_write = {}
+    
+    # Tags absents de la table au moment de l'écriture
+    for etypenum in to_write:
+        write_errors[etypenum] = "tag introuvable"
+    
+    return write_errors
 
-# =============================================================================
-# INJECTION EN MASSE
-# =============================================================================
-def inject_all_tags(override=False, progress_callback=None, interactive=True):
+def inject_all_tags(override=False, progress_callback=None, interactive=True,
+                    batch_size=2000, flush_callback=None):
     """
     Injecte phrases dans TOUS les tags custom
     
@@ -812,6 +1013,8 @@ def inject_all_tags(override=False, progress_callback=None, interactive=True):
     override=True  : Régénère TOUTES les phrases
     interactive=True : Mode CLI avec dialogues (défaut)
     interactive=False : Mode GUI sans input()
+    batch_size : nombre de tags regroupés par passe d'écriture dans T.DBF
+    flush_callback(n) : appelé après chaque lot écrit (n = tags du lot)
     """
     # SÉCURITÉ : Vérifier que TMG n'est pas en cours d'exécution
     if is_tmg_running():
@@ -825,6 +1028,7 @@ def inject_all_tags(override=False, progress_callback=None, interactive=True):
             'phrases_injected': 0,
             'phrases_replaced': 0,
             'tags_skipped': 0,
+            'tags_unchanged': 0,
             'errors': 1
         }
     
@@ -834,6 +1038,7 @@ def inject_all_tags(override=False, progress_callback=None, interactive=True):
         'phrases_injected': 0,
         'phrases_replaced': 0,
         'tags_skipped': 0,
+        'tags_unchanged': 0,
         'errors': 0
     }
     
@@ -877,6 +1082,37 @@ def inject_all_tags(override=False, progress_callback=None, interactive=True):
     
     log(f"📊 {len(custom_tags)} tag(s) custom détecté(s)\n")
     
+    # Nouvelles TSENTENCE en attente d'écriture : {ETYPENUM: (idx, nom, tsentence, injectées, régénérées, recno)}
+    pending = {}
+    
+    def flush():
+        """Écrit le lot en attente puis log les résultats (ordre d'origine des tags)"""
+        if not pending:
+            return
+        write_errors = _write_pending_tsentences(pending, backup_path)
+        
+        for etypenum, (idx, tag_name, _, injected, replaced, _) in sorted(pending.items(), key=lambda x: x[1][0]):
+            if etypenum in write_errors:
+                log(f"  [{idx:2d}] {tag_name:30s} - ERREUR : {write_errors[etypenum]}", 'ERROR')
+                stats['errors'] += 1
+                continue
+            
+            msg = f"  [{idx:2d}] {tag_name:30s}"
+            if injected > 0:
+                msg += f" - {injected} injectée(s)"
+            if replaced > 0:
+                msg += f" - {replaced} régénérée(s)"
+            
+            log(msg, 'SUCCESS')
+            
+            stats['tags_processed'] += 1
+            stats['phrases_injected'] += injected
+            stats['phrases_replaced'] += replaced
+        
+        if flush_callback:
+            flush_callback(len(pending))
+        pending.clear()
+    
     # Traiter chaque tag
     for idx, tag in enumerate(custom_tags, 1):
         tag_name = tag['ETYPENAME']
@@ -911,7 +1147,7 @@ def inject_all_tags(override=False, progress_callback=None, interactive=True):
             for rid, data in roles_data.items():
                 if not data['phrase'] or override:
                     role_name = data['role'].get('ENGLISH', 'Unknown')
-                    is_principal = 'principal' in role_name.lower()
+                    is_principal = _is_principal(role_name)
                     
                     phrase_en, phrase_fr = generate_phrase(tag_name, role_name, is_principal)
                     
@@ -925,35 +1161,28 @@ def inject_all_tags(override=False, progress_callback=None, interactive=True):
                     data['phrase']['ENGLISH'] = phrase_en
                     data['phrase']['FRENCH'] = phrase_fr
             
-            # Reconstruire TSENTENCE
+            # Reconstruire TSENTENCE (écrite par lots de batch_size tags)
             new_tsentence = rebuild_tsentence(roles_data)
-            
-            # Écrire dans DBF
-            t_dbf_path = get_tmg_file("T")
-            
-            with dbf.Table(t_dbf_path, codepage='cp1252') as table:
-                for record in table:
-                    if record['ETYPENUM'] == etypenum:
-                        with record:
-                            record['TSENTENCE'] = new_tsentence
-                        break
-            
-            # Log résultat
-            msg = f"  [{idx:2d}] {tag_name:30s}"
-            if injected > 0:
-                msg += f" - {injected} injectée(s)"
-            if replaced > 0:
-                msg += f" - {replaced} régénérée(s)"
-            
-            log(msg, 'SUCCESS')
-            
-            stats['tags_processed'] += 1
-            stats['phrases_injected'] += injected
-            stats['phrases_replaced'] += replaced
         
         except Exception as e:
             log(f"  [{idx:2d}] {tag_name:30s} - ERREUR : {e}", 'ERROR')
             stats['errors'] += 1
+            continue
+        
+        # Idempotence : contenu identique => le tag ne part pas à l'écriture
+        if new_tsentence.rstrip() == (tag['TSENTENCE'] or '').rstrip():
+            log(f"  [{idx:2d}] {tag_name:30s} - Inchangé", 'INFO')
+            stats['tags_skipped'] += 1
+            stats['tags_unchanged'] += 1
+            continue
+        
+        pending[etypenum] = (idx, tag_name, new_tsentence, injected, replaced, tag.get('RECNO'))
+        
+        if batch_size and len(pending) >= batch_size:
+            flush()
+    
+    # Dernier lot
+    flush()
     
     # Résumé final
     log("\n" + "="*80, 'HEADER')
@@ -965,6 +1194,8 @@ def inject_all_tags(override=False, progress_callback=None, interactive=True):
     if stats['phrases_replaced'] > 0:
         log(f"Phrases régénérées    : {stats['phrases_replaced']}", 'SUCCESS')
     log(f"Tags ignorés          : {stats['tags_skipped']}", 'INFO')
+    if stats['tags_unchanged'] > 0:
+        log(f"  dont inchangés      : {stats['tags_unchanged']} (aucune écriture)", 'INFO')
     log(f"Erreurs               : {stats['errors']}", 'ERROR' if stats['errors'] > 0 else 'INFO')
     log("\n⚠️  IMPORTANT : Ouvrez TMG et lancez File > Maintenance > Reindex", 'WARNING')
     
@@ -992,11 +1223,13 @@ def analyze_tag_mode(tag, tmg_project_path=None, tmg_prefix=None):
     else:
         select_tmg_project_gui()
     
-    print(f"DEBUG analyze_tag_mode: Looking for tag '{tag['ETYPENAME']}'")
+    if _DEBUG:
+        print(f"DEBUG analyze_tag_mode: Looking for tag '{tag['ETYPENAME']}'")
     
     # Ouvrir fichiers TMG
     t_dbf_path = get_tmg_file("T")
-    print(f"DEBUG: T.DBF path = {t_dbf_path}")
+    if _DEBUG:
+        print(f"DEBUG: T.DBF path = {t_dbf_path}")
     
     # Trouver le record du tag
     tag_record = None
@@ -1011,28 +1244,33 @@ def analyze_tag_mode(tag, tmg_project_path=None, tmg_prefix=None):
                 
                 
                 if tag_name_in_db == tag_name_search:
-                    print(f"DEBUG: MATCH! Found tag {tag_name_in_db}")
+                    if _DEBUG:
+                        print(f"DEBUG: MATCH! Found tag {tag_name_in_db}")
                     tag_record = rec
                     break
-        print(f"DEBUG: Scanned {count} custom tags")
+        if _DEBUG:
+            print(f"DEBUG: Scanned {count} custom tags")
     
     if not tag_record:
-        print(f"DEBUG: Tag '{tag['ETYPENAME']}' NOT FOUND in database")
+        if _DEBUG:
+            print(f"DEBUG: Tag '{tag['ETYPENAME']}' NOT FOUND in database")
         return {'roles': {}}
     
-    print(f"DEBUG: Tag found, parsing TSENTENCE...")
+    if _DEBUG:
+        print(f"DEBUG: Tag found, parsing TSENTENCE...")
     
     # Parser TSENTENCE
     tsentence_str = tag_record.tsentence
     roles_data = parse_tsentence(tsentence_str) if tsentence_str else {}
     
-    print(f"DEBUG: Parsed {len(roles_data)} roles from TSENTENCE")
+    if _DEBUG:
+        print(f"DEBUG: Parsed {len(roles_data)} roles from TSENTENCE")
     
     # Construire résultat
     result = {'roles': {}}
     
     for rid, data in roles_data.items():
-        role_name = data['role'].get('ENGLISHUK', data['role'].get('ENGLISH', f"Role {rid}"))
+        role_name = data['role'].get('ENGLISHUK') or data['role'].get('ENGLISH') or f"Role {rid}"
         has_phrase = bool(data['phrase'].get('ENGLISHUK') or data['phrase'].get('ENGLISH'))
         
         result['roles'][rid] = {
@@ -1090,12 +1328,15 @@ def inject_single_tag_mode(tag, tmg_project_path=None, tmg_prefix=None,
     return {'sentences_injected': 1}  # Simplifié pour l'instant
 
 def inject_all_tags_mode(tmg_project_path=None, tmg_prefix=None, override=False, 
-                         log_callback=None, progress_callback=None, language='EN'):
+                         log_callback=None, progress_callback=None, language='EN',
+                         batch_size=2000, flush_callback=None):
     """
     Mode dual CLI/GUI pour injection en masse
     
     Args:
         language: 'EN' ou 'FR' (pour GUI, CLI demande au démarrage)
+        batch_size: tags écrits par passe dans T.DBF
+        flush_callback: appelé après chaque lot écrit
     """
     global TMG_PATH, TMG_PREFIX, LOG_CALLBACK, LANGUAGE
     
@@ -1112,35 +1353,82 @@ def inject_all_tags_mode(tmg_project_path=None, tmg_prefix=None, override=False,
     interactive = (log_callback is None)  # CLI = interactive, GUI = non-interactive
     
     return inject_all_tags(override=override, progress_callback=progress_callback, 
-                          interactive=interactive)
+                          interactive=interactive, batch_size=batch_size,
+                          flush_callback=flush_callback)
 
 # =============================================================================
 # MENU PRINCIPAL
 # =============================================================================
+@functools.lru_cache(maxsize=None)
+def _menu_block(lang, keys):
+    """Bloc de menu complet (cadre + lignes traduites), construit une fois par langue"""
+    lines = ["", "="*80, t(keys[0]), "="*80]
+    lines.extend(t(k) for k in keys[1:])
+    return "\n".join(lines) + "\n\n"
+
 def show_menu():
     """Affiche menu principal"""
-    print("\n" + "="*80)
-    print(t('menu_title'))
-    print("="*80)
-    print(t('menu_1'))
-    print(t('menu_2'))
-    print(t('menu_3'))
-    print(t('menu_4'))
-    print(t('menu_5'))
-    print()
+    sys.stdout.write(_menu_block(LANGUAGE, ('menu_title', 'menu_1', 'menu_2',
+                                            'menu_3', 'menu_4', 'menu_5')))
+    sys.stdout.flush()
 
 def show_submenu_all():
     """Affiche sous-menu 'Traiter TOUS'"""
-    print("\n" + "="*80)
-    print(t('submenu_title'))
-    print("="*80)
-    print(t('submenu_1'))
-    print(t('submenu_2'))
-    print(t('submenu_3'))
-    print()
+    sys.stdout.write(_menu_block(LANGUAGE, ('submenu_title', 'submenu_1',
+                                            'submenu_2', 'submenu_3')))
+    sys.stdout.flush()
 
-def main():
+def parse_args(argv=None):
+    """Arguments CLI ; sans action (--list/--inject/--inject-all) on garde le menu"""
+    parser = argparse.ArgumentParser(description='TMG Sentence Injector v5.0')
+    parser.add_argument('--pjc', help='Fichier projet TMG (.PJC), sans dialogue de sélection')
+    parser.add_argument('--lang', choices=('EN', 'FR'), type=str.upper,
+                        help='Langue de l\'interface, sans question au démarrage')
+    parser.add_argument('--list', action='store_true', help='Lister les tags custom')
+    parser.add_argument('--inject', type=int, metavar='ETYPENUM',
+                        help='Injecter les phrases d\'un tag (numéro ETYPENUM)')
+    parser.add_argument('--inject-all', action='store_true',
+                        help='Injecter les phrases de tous les tags custom')
+    parser.add_argument('--regenerate', action='store_true',
+                        help='Avec --inject/--inject-all : régénérer TOUTES les phrases')
+    parser.add_argument('--yes', action='store_true',
+                        help='Ne poser aucune question de confirmation')
+    return parser.parse_args(argv)
+
+def run_batch(args, custom_tags):
+    """Exécute les actions demandées en ligne de commande, sans menu (code de sortie)"""
+    interactive = not args.yes
+    
+    if args.list:
+        for i, tag in enumerate(custom_tags, 1):
+            print(f"   {i:2d}. {tag['ETYPENAME']} ({tag['ETYPENUM']})")
+    
+    if args.inject is not None:
+        tag = next((tag for tag in custom_tags if tag['ETYPENUM'] == args.inject), None)
+        if tag is None:
+            log(f"❌ Tag custom {args.inject} introuvable", 'ERROR')
+            return 1
+        if not inject_single_tag(tag, override=args.regenerate, interactive=interactive):
+            return 1
+    
+    if args.inject_all:
+        stats = inject_all_tags(override=args.regenerate, interactive=interactive)
+        if stats['errors']:
+            return 1
+    
+    return 0
+
+def main(argv=None):
     """Point d'entrée CLI"""
+    global TMG_PATH, TMG_PREFIX
+    
+    args = parse_args(argv)
+    batch = args.list or args.inject is not None or args.inject_all
+    
+    # Progression visible immédiatement, même quand stdout est redirigé
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=True)
+    
     # SÉCURITÉ : Vérifier que TMG n'est pas en cours d'exécution
     if is_tmg_running():
         print("\n" + "="*80)
@@ -1149,25 +1437,37 @@ def main():
         print("\nPlease close The Master Genealogist before running Sentence Injection.")
         print("\nModifying database files while TMG is open can cause corruption.")
         print("\n" + "="*80)
-        input("\nPress ENTER to exit...")
+        if not batch:
+            input("\nPress ENTER to exit...")
         return 1
     
     # Choix de la langue
-    ask_language()
+    if args.lang:
+        set_language(args.lang)
+    else:
+        ask_language()
     
     # Sélection projet
-    select_tmg_project_gui()
-    
-    print(f"\n📂 {t('project')} : {TMG_PATH}")
-    print(f"🔖 {t('prefix')} : {TMG_PREFIX}")
+    if args.pjc:
+        TMG_PATH = os.path.dirname(os.path.abspath(args.pjc))
+        TMG_PREFIX = _extract_prefix(args.pjc)
+        if not TMG_PREFIX:
+            log(f"❌ {t('cannot_determine_prefix')}", 'ERROR')
+            return 1
+    else:
+        select_tmg_project_gui()
     
     # Vérifier fichier
     t_dbf_path = get_tmg_file("T")
+    
+    # Bandeau projet : formaté une fois, écrit en un seul appel
+    banner = f"\n📂 {t('project')} : {TMG_PATH}\n🔖 {t('prefix')} : {TMG_PREFIX}\n"
     if not os.path.exists(t_dbf_path):
-        print(f"\n❌ {t('file_not_found')} : {t_dbf_path}")
+        sys.stdout.write(f"{banner}\n❌ {t('file_not_found')} : {t_dbf_path}\n")
         return 1
     
-    print(f"✅ {t('file_found')} : {t_dbf_path}")
+    sys.stdout.write(f"{banner}✅ {t('file_found')} : {t_dbf_path}\n")
+    sys.stdout.flush()
     
     # Lister tags
     custom_tags = list_custom_tags()
@@ -1178,70 +1478,88 @@ def main():
     
     print(f"\n📊 {len(custom_tags)} {t('custom_tags_found')}")
     
-    # Menu principal
-    while True:
-        show_menu()
-        
-        choice = input(t('menu_choice')).strip()
-        
-        if choice == '1':
-            # Lister tags
-            print(f"\n📋 {t('custom_tags_list')}")
-            for i, tag in enumerate(custom_tags, 1):
-                name = tag['ETYPENAME']
-                print(f"   {i:2d}. {name}")
-        
-        elif choice == '2':
-            # Examiner un tag
-            num = input(f"\n{t('number')} (1-{len(custom_tags)}) : ").strip()
-            try:
-                idx = int(num) - 1
-                if 0 <= idx < len(custom_tags):
-                    display_tag_info(custom_tags[idx])
-            except:
-                print(f"❌ {t('invalid_choice')}")
-        
-        elif choice == '3':
-            # Injecter UN tag
-            num = input(f"\n{t('number')} (1-{len(custom_tags)}) : ").strip()
-            try:
-                idx = int(num) - 1
-                if 0 <= idx < len(custom_tags):
-                    inject_single_tag(custom_tags[idx])
-            except:
-                print(f"❌ {t('invalid_choice')}")
-        
-        elif choice == '4':
-            # Sous-menu Traiter TOUS
-            while True:
-                show_submenu_all()
-                
-                sub_choice = input(t('submenu_choice')).strip()
-                
-                if sub_choice == '1':
-                    # Phrases manquantes seulement
-                    inject_all_tags(override=False)
-                    break
-                
-                elif sub_choice == '2':
-                    # Régénérer TOUTES
-                    inject_all_tags(override=True)
-                    break
-                
-                elif sub_choice == '3':
-                    # Retour
-                    break
-                
-                else:
-                    print(f"❌ {t('invalid_choice')}")
+    # Actions du menu principal (custom_tags est relu à chaque tour de boucle)
+    def do_list():
+        print(f"\n📋 {MENU_STRINGS['custom_tags_list']}")
+        for i, tag in enumerate(custom_tags, 1):
+            name = tag['ETYPENAME']
+            print(f"   {i:2d}. {name}")
+    
+    def ask_tag():
+        num = input(f"\n{MENU_STRINGS['number']} (1-{len(custom_tags)}) : ").strip()
+        if not num.isdigit():
+            print(f"❌ {MENU_STRINGS['invalid_choice']}")
+            return None
+        idx = int(num) - 1
+        if 0 <= idx < len(custom_tags):
+            return custom_tags[idx]
+        return None
+    
+    def do_examine():
+        tag = ask_tag()
+        if tag:
+            display_tag_info(tag)
+    
+    def do_inject_one():
+        tag = ask_tag()
+        if tag:
+            inject_single_tag(tag)
+    
+    def do_submenu():
+        # Sous-menu Traiter TOUS : un seul choix, retour au menu principal ensuite
+        show_submenu_all()
         
-        elif choice == '5':
-            # Quitter
-            print(f"\n👋 {t('goodbye')}")
-            break
+        sub_choice = input(MENU_STRINGS['submenu_choice']).strip()
         
-        else:
-            print(f"❌ {t('invalid_choice')}")
+        sub_handlers.get(sub_choice, do_invalid)()
+    
+    def do_quit():
+        print(f"\n👋 {MENU_STRINGS['goodbye']}")
+        return 'quit'
+    
+    def do_invalid():
+        print(f"❌ {MENU_STRINGS['invalid_choice']}")
+    
+    sub_handlers = {
+        '1': lambda: inject_all_tags(override=False),  # Phrases manquantes seulement
+        '2': lambda: inject_all_tags(override=True),   # Régénérer TOUTES
+        '3': lambda: None,                             # Retour
+    }
+    
+    handlers = {
+        '1': do_list,
+        '2': do_examine,
+        '3': do_inject_one,
+        '4': do_submenu,
+        '5': do_quit,
+    }
+    
+    # Verrou du projet pour toute la session (pas de seconde session concurrente)
+    session_lock = _lock_session(t_dbf_path)
+    if session_lock is None:
+        return 1
+    
+    # Actions en ligne de commande : pas de menu
+    if batch:
+        try:
+            return run_batch(args, custom_tags)
+        finally:
+            _unlock_session(session_lock)
+    
+    # Menu principal
+    try:
+        while True:
+            # Relecture via le cache : T.DBF n'est re-scanné que s'il a été modifié
+            custom_tags = list_custom_tags() or custom_tags
+            
+            show_menu()
+            
+            choice = input(MENU_STRINGS['menu_choice']).strip()
+            
+            if handlers.get(choice, do_invalid)() == 'quit':
+                break
+    finally:
+        _unlock_session(session_lock)
     
     return 0
 
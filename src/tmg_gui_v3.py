@@ -13,74 +13,230 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import os
 import sys
-import time
 import json
 import queue
 import threading
 import re
-import subprocess
 import platform
-
-# Import modules
-try:
-    import mapping_tool
-except ImportError:
+import mmap
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from collections import deque
+import importlib
+import importlib.util
+from types import MappingProxyType
+
+from tmg_process import is_tmg_running
+
+# Modules moteurs - LAZY LOADING (import au premier usage, voir _load_engine)
+# mapping_tool charge openpyxl et sentence_injector charge dbf : on ne vérifie
+# ici que leur présence, sans payer leur import au démarrage de l'interface.
+if importlib.util.find_spec('mapping_tool') is None:
     print("❌ ERREUR: mapping_tool.py introuvable!")
     sys.exit(1)
+mapping_tool = None
 
-try:
-    import sentence_injector
-except ImportError:
+SENTENCE_INJECTOR_AVAILABLE = importlib.util.find_spec('sentence_injector') is not None
+if not SENTENCE_INJECTOR_AVAILABLE:
     print("⚠️  WARNING: sentence_injector.py not found - Sentence Injection disabled")
-    sentence_injector = None
+sentence_injector = None
 
 # Role injector - LAZY LOADING (import seulement quand nécessaire)
 # Évite le crash si mapping.json absent au démarrage
 role_injector = None
 
+def _load_engine(name):
+    """
+    Importe un module moteur (mapping_tool, sentence_injector) au premier usage
+    et le mémorise dans la variable globale du même nom.
+    
+    Les moteurs font sys.exit(1) si une dépendance manque : converti en
+    ImportError pour être affiché dans les logs au lieu de tuer le thread.
+    """
+    module = globals().get(name)
+    if module is None:
+        try:
+            module = importlib.import_module(name)
+        except SystemExit:
+            raise ImportError(f"{name}: missing dependency (pip install dbf.py openpyxl)")
+        globals()[name] = module
+    return module
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 CONFIG_FILE = "tmg_suite_config.json"
 
-DEFAULT_CONFIG = {
+# Plateforme : constante pendant l'exécution, calculée une fois
+_SYSTEM = platform.system()
+IS_WINDOWS = _SYSTEM == 'Windows'
+IS_MAC = _SYSTEM == 'Darwin'
+
+# Lecture seule : dict(DEFAULT_CONFIG) pour obtenir une copie modifiable
+DEFAULT_CONFIG = MappingProxyType({
     'gedcom_path': '',
     'tmg_project_path': ''
-}
+})
+
+try:
+    import orjson  # Optionnel : parseur JSON en C, plus rapide que json
+except ImportError:
+    orjson = None
+
+_CONFIG_CACHE = None  # ((mtime_ns, taille), config parsée)
+_CONFIG_LOCK = threading.Lock()  # Lecture (thread Tk) / écriture (threads de travail)
+
+def _read_config():
+    """Lit CONFIG_FILE ; le parse est réutilisé tant que le fichier n'a pas changé"""
+    global _CONFIG_CACHE
+    with _CONFIG_LOCK:
+        st = os.stat(CONFIG_FILE)
+        signature = (st.st_mtime_ns, st.st_size)
+        if _CONFIG_CACHE and _CONFIG_CACHE[0] == signature:
+            return dict(_CONFIG_CACHE[1])
+        
+        with open(CONFIG_FILE, 'rb') as f:
+            data = f.read()
+        config = orjson.loads(data) if orjson else json.loads(data)
+        _CONFIG_CACHE = (signature, config)
+        return dict(config)
+
+def _write_config(config):
+    """
+    Écrit CONFIG_FILE et met le cache à jour (pas de relecture au prochain load).
+    Écriture dans un fichier temporaire puis os.replace : jamais de config tronquée.
+    """
+    global _CONFIG_CACHE
+    with _CONFIG_LOCK:
+        tmp_path = CONFIG_FILE + '.tmp'
+        if orjson:
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+        else:
+            with open(tmp_path, 'w') as f:
+                json.dump(config, f, indent=2)
+        os.replace(tmp_path, CONFIG_FILE)
+        st = os.stat(CONFIG_FILE)
+        _CONFIG_CACHE = ((st.st_mtime_ns, st.st_size), dict(config))
+
+# =============================================================================
+# JOURNAL DISQUE
+# =============================================================================
+GUI_LOG_FILE = "tmg_suite.log"
+GUI_LOG_MAX_BYTES = 5 << 20  # 5 Mo par fichier, 3 fichiers de rotation
+GUI_LOG_BACKUPS = 3
+
+def _start_file_log():
+    """
+    Journal complet sur disque (le widget ne garde que les dernières lignes).
+    Les threads déposent dans une file ; l'écriture se fait dans le thread
+    du QueueListener. Retourne (logger, listener) ou (None, None).
+    """
+    try:
+        handler = RotatingFileHandler(GUI_LOG_FILE, maxBytes=GUI_LOG_MAX_BYTES,
+                                      backupCount=GUI_LOG_BACKUPS, encoding='utf-8')
+    except OSError:
+        return None, None
+    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s', '%Y-%m-%d %H:%M:%S'))
+    
+    file_queue = queue.Queue()
+    listener = QueueListener(file_queue, handler)
+    listener.start()
+    
+    logger = logging.getLogger('tmg_suite')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(QueueHandler(file_queue))
+    return logger, listener
 
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
-def is_tmg_running():
+def count_gedcom_witnesses(gedcom_path):
     """
-    Vérifie si The Master Genealogist est en cours d'exécution.
-    Supporte TMG v7, v8, v9 (tmg7.exe, tmg8.exe, tmg9.exe).
+    Compte les références témoins (_SHAR @) du GEDCOM.
     
-    CRITIQUE : Modifier les fichiers DBF pendant que TMG est ouvert peut causer
-    une corruption de base de données.
+    Scan binaire sans décodage : fichier mappé en mémoire (mmap.find en C),
+    repli sur une lecture par blocs de 4 Mo si le mappage est impossible
+    (fichier vide, flux non mappable).
+    """
+    marker_len = len(WITNESS_MARKER)
+    with open(gedcom_path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                count = 0
+                pos = mm.find(WITNESS_MARKER)
+                while pos != -1:
+                    count += 1
+                    pos = mm.find(WITNESS_MARKER, pos + marker_len)
+                return count
+        except (ValueError, OSError):
+            pass
+        
+        # Lecture par blocs ; on garde la fin du bloc précédent pour ne pas
+        # rater un marqueur à cheval sur deux blocs
+        count = 0
+        tail = b''
+        while True:
+            chunk = f.read(SCAN_CHUNK_SIZE)
+            if not chunk:
+                return count
+            buf = tail + chunk
+            count += buf.count(WITNESS_MARKER)
+            tail = buf[-(marker_len - 1):]
+
+def cached_witness_count(mapping_data, gedcom_path):
+    """
+    Nombre de témoins déjà compté par mapping_tool (scan_gedcom), si le
+    GEDCOM n'a pas changé depuis : mapping.json (_meta.gedcom_stats) ou,
+    à défaut, le module mapping_tool déjà chargé dans cette session.
     
     Returns:
-        bool: True si un processus TMG est détecté
+        int | None: None si aucune stat valide (re-scan nécessaire)
     """
-    if platform.system() == 'Windows':
-        try:
-            # Vérifier les 3 versions possibles
-            for exe_name in ['tmg9.exe', 'tmg8.exe', 'tmg7.exe']:
-                result = subprocess.run(
-                    ['tasklist', '/FI', f'IMAGENAME eq {exe_name}'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if exe_name in result.stdout:
-                    return True
-            return False
-        except Exception:
-            # Si la vérification échoue, on continue (mieux que bloquer)
-            return False
-    return False  # Sur non-Windows, on assume que c'est OK
+    candidates = [mapping_data.get('_meta', {}).get('gedcom_stats')]
+    if mapping_tool is not None:
+        candidates.append(mapping_tool.GEDCOM_STATS)
+    
+    try:
+        st = os.stat(gedcom_path)
+    except OSError:
+        return None
+    gedcom = os.path.abspath(gedcom_path)
+    
+    for stats in candidates:
+        if (stats and stats.get('gedcom') == gedcom
+                and stats.get('mtime_ns') == st.st_mtime_ns
+                and stats.get('size') == st.st_size):
+            return stats.get('witness_count')
+    return None
 
 class TMGSuiteGUI(tk.Tk):
+    # URLs file:/// cliquables dans les logs (compilé une fois)
+    _URL_RE = re.compile(r'(file:///[^\r\n]+)')
+    
+    # Préfixes des lignes de log par niveau
+    _LOG_PREFIXES = {
+        'INFO': '  ',
+        'SUCCESS': '✅ ',
+        'WARNING': '⚠️  ',
+        'ERROR': '❌ ',
+        'HEADER': ''
+    }
+    _DEFAULT_LOG_PREFIX = _LOG_PREFIXES['INFO']  # Niveau inconnu
+    
+    # Intervalle de polling des queues (ms) selon l'activité
+    _POLL_BUSY_MS = 20
+    _POLL_IDLE_MS = 200
+    _LOG_BATCH_MAX = 500  # Lignes de log insérées au plus par passage
+    _PREVIEW_BATCH = 250  # Entrées d'aperçu insérées par passage (~1000 lignes)
+    _LINK_TAG_PREFIX = 'hyperlink_'  # Tag unique par lien cliquable
+    
+    # Taille max du log : au-delà de _MAX_LOG_LINES + _LOG_TRIM_SLACK lignes,
+    # les plus anciennes sont supprimées en un seul delete
+    _MAX_LOG_LINES = 5000
+    _LOG_TRIM_SLACK = 500
+    
     def __init__(self):
         super().__init__()
         
@@ -92,8 +248,25 @@ class TMGSuiteGUI(tk.Tk):
         self.tmg_project_path = tk.StringVar()
         self.tmg_prefix = tk.StringVar()  # Calculé automatiquement
         
+        # Noms courts (menu Files in use), recalculés seulement quand le chemin change
+        self._gedcom_short = ''
+        self._tmg_short = ''
+        self.gedcom_path.trace_add('write', lambda *_: setattr(
+            self, '_gedcom_short', os.path.basename(self.gedcom_path.get())))
+        self.tmg_project_path.trace_add('write', lambda *_: setattr(
+            self, '_tmg_short', os.path.basename(self.tmg_project_path.get())))
+        
         self.excel_mapping_path = None
         self.json_mapping_path = None
+        self.custom_tags = []  # Rempli par load_custom_tags (thread)
+        self._tags_by_name = {}  # {ETYPENAME: tag} pour la sélection
+        self._role_dialog = None  # Dialogue Role Injection (réutilisé)
+        self._help_dialogs = {}  # {titre: Toplevel} des dialogues d'aide (réutilisés)
+        self._mapping_snapshot = None  # (chemin, mtime_ns, taille, données mapping.json)
+        self._witness_count_cache = {}  # {(chemin, mtime_ns, taille): nb _SHAR}
+        
+        # Journal disque (avant create_widgets qui logge déjà)
+        self._file_log, self._file_log_listener = _start_file_log()
         
         # Interface
         self.create_widgets()
@@ -104,9 +277,42 @@ class TMGSuiteGUI(tk.Tk):
         # Charger config (met à jour le menu automatiquement)
         self.load_config()
         
-        # Thread-safe logging
+        # Thread-safe logging + appels UI depuis les threads de travail
         self.log_queue = queue.Queue()
+        self.ui_queue = queue.Queue()
+        # Dernier statut demandé par un thread ; un seul config() en attente à la fois
+        self._pending_status = None
+        self._status_lock = threading.Lock()
         self.after(50, self._poll_log_queue)
+        
+        # Un seul thread de travail, démarré une fois : les actions s'exécutent
+        # l'une après l'autre dans l'ordre des clics
+        self._tasks = queue.Queue()
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
+        
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    def _worker_loop(self):
+        """Thread de travail : exécute les tâches de self._tasks en série"""
+        while True:
+            func, args = self._tasks.get()
+            try:
+                func(*args)
+            except Exception as e:
+                # Les méthodes *_thread gèrent leurs erreurs ; filet de sécurité
+                self.thread_safe_log(f"Unexpected error: {e}", 'ERROR')
+    
+    def _run_in_worker(self, func, *args):
+        """Confie func(*args) au thread de travail"""
+        self._tasks.put((func, args))
+    
+    def _on_close(self):
+        """Fermeture : vide le journal disque puis détruit la fenêtre"""
+        if self._file_log_listener:
+            self._file_log_listener.stop()
+            self._file_log_listener = None
+        self.destroy()
     
     def create_menu(self):
         """Créer menu"""
@@ -133,7 +339,7 @@ class TMGSuiteGUI(tk.Tk):
         file_menu.add_separator()
         file_menu.add_command(label="Clear Logs", command=self.clear_logs)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.quit)
+        file_menu.add_command(label="Exit", command=self._on_close)
         
         # Tools menu
         tools_menu = tk.Menu(menubar, tearoff=0)
@@ -143,6 +349,8 @@ class TMGSuiteGUI(tk.Tk):
         mapping_menu = tk.Menu(tools_menu, tearoff=0)
         tools_menu.add_cascade(label="1. Mapping Tool", menu=mapping_menu)
         mapping_menu.add_command(label="Generate Excel", command=self.run_mapping_generate, accelerator="Ctrl+G")
+        mapping_menu.add_command(label="Generate Excel (force GEDCOM rescan)",
+                                 command=lambda: self.run_mapping_generate(force_rescan=True))
         mapping_menu.add_command(label="Compile JSON", command=self.run_mapping_compile, accelerator="Ctrl+J")
         
         # 2. Role Injection
@@ -244,7 +452,7 @@ class TMGSuiteGUI(tk.Tk):
         # Caché par défaut
         
         # Désactiver si sentence_injector absent
-        if not sentence_injector:
+        if not SENTENCE_INJECTOR_AVAILABLE:
             btn_inject_one.config(state=tk.DISABLED)
             self.btn_inject_missing.config(state=tk.DISABLED)
             self.btn_regenerate_all.config(state=tk.DISABLED)
@@ -260,12 +468,22 @@ class TMGSuiteGUI(tk.Tk):
             height=20,
             wrap=tk.WORD,
             font=('Consolas', 9),
-            state=tk.DISABLED
+            state=tk.DISABLED,
+            # Log en lecture seule : aucune pile d'annulation à entretenir
+            undo=False,
+            maxundo=0,
+            autoseparators=False
         )
         self.log_text.pack(fill=tk.BOTH, expand=True)
         
-        # Compteur pour tags de liens uniques
+        # Compteur pour tags de liens uniques + cible de chaque lien
         self._link_id = 0
+        self._link_targets = {}  # {tag du lien: url file:///}
+        
+        # Logs reçus fenêtre masquée/iconifiée : affichés au retour
+        # (<Map> de la fenêtre principale, _poll_log_queue en secours)
+        self._pending_log = deque(maxlen=self._MAX_LOG_LINES)
+        self.bind('<Map>', self._on_map, add='+')
         
         # Tags couleurs
         self.log_text.tag_config('INFO', foreground='black')
@@ -274,8 +492,9 @@ class TMGSuiteGUI(tk.Tk):
         self.log_text.tag_config('ERROR', foreground='#DD0000', font=('Consolas', 9, 'bold'))
         self.log_text.tag_config('HEADER', foreground='#0066CC', font=('Consolas', 10, 'bold'))
         
-        # Tag hyperlink (liens cliquables) - style seulement
+        # Tag hyperlink (liens cliquables) - un seul binding pour tous les liens
         self.log_text.tag_config('hyperlink', foreground='#0066FF', underline=True)
+        self.log_text.tag_bind('hyperlink', "<Button-1>", self._on_link_click)
         
         # =================================================================
         # STATUS BAR
@@ -331,79 +550,246 @@ class TMGSuiteGUI(tk.Tk):
     
     def append_log(self, message, level='INFO'):
         """Ajoute message au log avec liens cliquables"""
+        if self._file_log:
+            self._file_log.info('[%s] %s', level, message)
+        if self._defer_log(((message, level),)):
+            return
+        follow = self._log_at_bottom()
+        self.log_text.config(state=tk.NORMAL)
+        self._insert_log(message, level)
+        self._trim_log()
+        if follow:
+            self.log_text.yview_moveto(1.0)
+        self.log_text.config(state=tk.DISABLED)
+    
+    def _append_log_batch(self, messages):
+        """
+        Ajoute plusieurs (message, level) en regroupant les insertions :
+        les messages consécutifs de même niveau sans URL partent en un seul
+        insert ; un seul défilement en bas (yview_moveto, sans le calcul
+        de visibilité de see) pour tout le lot.
+        """
+        if not self._defer_log(messages):
+            self._write_log_batch(messages)
+    
+    def _write_log_batch(self, messages):
+        """Insertion effective d'un lot dans le widget (voir _append_log_batch)"""
+        follow = self._log_at_bottom()
+        self.log_text.config(state=tk.NORMAL)
+        
+        group_level = None
+        group = []
+        for message, level in messages:
+            if not isinstance(message, str):
+                message = str(message)
+            if 'file:///' in message:
+                # Lien cliquable : insertion détaillée
+                if group:
+                    self.log_text.insert(tk.END, ''.join(group), group_level)
+                    group = []
+                self._insert_log(message, level)
+                continue
+            if level != group_level and group:
+                self.log_text.insert(tk.END, ''.join(group), group_level)
+                group = []
+            group_level = level
+            group.append(f"{self._LOG_PREFIXES.get(level, self._DEFAULT_LOG_PREFIX)}{message}\n")
+        if group:
+            self.log_text.insert(tk.END, ''.join(group), group_level)
+        
+        self._trim_log()
+        if follow:
+            self.log_text.yview_moveto(1.0)
+        self.log_text.config(state=tk.DISABLED)
+    
+    def _defer_log(self, messages):
+        """
+        Log non visible (fenêtre iconifiée ou pas encore affichée) : met les
+        messages de côté sans toucher au widget. True si différés.
+        Tant que des messages attendent, les suivants passent derrière eux.
+        """
+        if not self._pending_log and self.log_text.winfo_viewable():
+            return False
+        self._pending_log.extend(messages)
+        return True
+    
+    def _on_map(self, event):
+        """Fenêtre principale ré-affichée (restaurée) : vider les logs différés"""
+        # Le bind sur la toplevel reçoit aussi les <Map> des enfants
+        if event.widget is self:
+            self.after_idle(self._flush_pending_log)
+    
+    def _flush_pending_log(self, event=None):
+        """Affiche les logs différés, par lots, quand le log redevient visible"""
+        if not self._pending_log or not self.log_text.winfo_viewable():
+            return
+        batch = [self._pending_log.popleft()
+                 for _ in range(min(self._LOG_BATCH_MAX, len(self._pending_log)))]
+        self._write_log_batch(batch)
+        if self._pending_log:
+            self.after_idle(self._flush_pending_log)
+    
+    def _log_at_bottom(self):
+        """True si la vue du log est en bas (sinon l'utilisateur relit : ne pas défiler)"""
+        return self.log_text.yview()[1] > 0.98
+    
+    def _trim_log(self):
+        """Borne le nombre de lignes du log (widget déjà en état NORMAL)"""
+        lines = int(self.log_text.index('end-1c').split('.')[0])
+        if lines > self._MAX_LOG_LINES + self._LOG_TRIM_SLACK:
+            self.log_text.delete('1.0', f'{lines - self._MAX_LOG_LINES}.0')
+            self._prune_links()
+    
+    def _prune_links(self):
+        """Oublie les liens dont le texte a été supprimé du log"""
+        for tag in [t for t in self._link_targets if not self.log_text.tag_ranges(t)]:
+            del self._link_targets[tag]
+            self.log_text.tag_delete(tag)
+    
+    def _on_link_click(self, event):
+        """Clic sur un lien : retrouve l'url via le tag unique sous le curseur"""
+        for tag in self.log_text.tag_names('current'):
+            url = self._link_targets.get(tag)
+            if url:
+                self._open_file_url(url)
+                return
+    
+    def _insert_log(self, message, level):
+        """Insère une ligne de log (widget déjà en état NORMAL)"""
         # Convertir en string si nécessaire
         if not isinstance(message, str):
             message = str(message)
         
-        self.log_text.config(state=tk.NORMAL)
-        
-        # Préfixes
-        prefix = {
-            'INFO': '  ',
-            'SUCCESS': '✅ ',
-            'WARNING': '⚠️  ',
-            'ERROR': '❌ ',
-            'HEADER': ''
-        }.get(level, '  ')
-        
-        # Détecter URLs file:///
-        url_pattern = r'(file:///[^\r\n]+)'
-        parts = re.split(url_pattern, message)
+        prefix = self._LOG_PREFIXES.get(level, self._DEFAULT_LOG_PREFIX)
         
         # Insérer préfixe
         self.log_text.insert(tk.END, prefix, level)
         
+        # Cas courant : pas d'URL, une seule insertion sans split
+        if 'file:///' not in message:
+            parts = (message,)
+        else:
+            parts = self._URL_RE.split(message)
+        
         # Insérer message avec URLs cliquables
         for part in parts:
             if part.startswith('file:///'):
                 self._link_id += 1
-                tag = f"hyperlink_{self._link_id}"
+                tag = f"{self._LINK_TAG_PREFIX}{self._link_id}"
                 
                 # Insérer le texte du lien avec tags: level + hyperlink + tag unique
+                # (l'url est retrouvée au clic via _link_targets)
                 self.log_text.insert(tk.END, part, (level, 'hyperlink', tag))
-                
-                # Bind sur CE lien (pas besoin de calculer @x,y)
-                self.log_text.tag_bind(tag, "<Button-1>", lambda e, url=part: self._open_file_url(url))
+                self._link_targets[tag] = part
             else:
                 # Texte normal
                 self.log_text.insert(tk.END, part, level)
         
         self.log_text.insert(tk.END, '\n')
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
-        self.update_idletasks()
     
     def thread_safe_log(self, message, level='INFO'):
         """Thread-safe version of append_log - puts message in queue"""
         self.log_queue.put((message, level))
+        if self._file_log:
+            self._file_log.info('[%s] %s', level, message)
+    
+    def thread_safe_call(self, func, *args, **kwargs):
+        """Thread-safe: exécute func(*args, **kwargs) dans le thread Tk principal"""
+        self.ui_queue.put((func, args, kwargs))
+    
+    def _call_and_wait(self, func):
+        """
+        Thread-safe: exécute func() dans le thread Tk (ex. dialogue) et bloque
+        le thread appelant jusqu'au résultat, sans polling.
+        Retourne None si func lève une exception.
+        """
+        done = threading.Event()
+        result = [None]
+        
+        def run():
+            try:
+                result[0] = func()
+            finally:
+                done.set()
+        
+        self.thread_safe_call(run)
+        done.wait()
+        return result[0]
+    
+    def thread_safe_status(self, text):
+        """
+        Thread-safe: met à jour la barre de statut.
+        Les mises à jour rapprochées sont fusionnées : seul le dernier texte
+        est appliqué au prochain passage de _poll_log_queue.
+        """
+        with self._status_lock:
+            scheduled = self._pending_status is not None
+            self._pending_status = text
+        if not scheduled:
+            self.thread_safe_call(self._apply_pending_status)
+    
+    def _apply_pending_status(self):
+        """Applique le dernier statut en attente (thread Tk)"""
+        with self._status_lock:
+            text, self._pending_status = self._pending_status, None
+        if text is not None:
+            self.status_label.config(text=text)
     
     def _poll_log_queue(self):
-        """Poll log queue and process messages (runs in main Tk thread)"""
+        """Poll log + UI queues and process them (runs in main Tk thread)"""
+        # Lot borné : une rafale de logs ne bloque pas la boucle Tk plus d'un passage
+        messages = []
         try:
-            while True:
-                msg, lvl = self.log_queue.get_nowait()
-                self.append_log(msg, lvl)
+            while len(messages) < self._LOG_BATCH_MAX:
+                messages.append(self.log_queue.get_nowait())
         except queue.Empty:
-            pass
-        # Re-schedule polling
-        self.after(50, self._poll_log_queue)
+            backlog = False
+        else:
+            backlog = True
+        # Secours si le <Map> de restauration n'a pas été reçu : ne jamais
+        # laisser le log figé sur des messages différés
+        if self._pending_log and self.log_text.winfo_viewable():
+            self._flush_pending_log()
+            flushed = True
+        else:
+            flushed = False
+        if messages:
+            self._append_log_batch(messages)
+        # Appels UI après les logs (les messages postés avant un dialogue s'affichent
+        # d'abord) : différés tant que le lot de logs n'est pas vidé
+        busy = bool(messages) or flushed
+        if not backlog:
+            try:
+                while True:
+                    func, args, kwargs = self.ui_queue.get_nowait()
+                    busy = True
+                    try:
+                        func(*args, **kwargs)
+                    except Exception as e:
+                        self.append_log(f"UI error: {e}", 'ERROR')
+            except queue.Empty:
+                pass
+        # Re-schedule polling : rapide pendant une rafale, espacé au repos
+        self.after(self._POLL_BUSY_MS if busy else self._POLL_IDLE_MS, self._poll_log_queue)
     
     def _open_file_url(self, file_url):
         """Ouvre fichier depuis URL file:///"""
         
         if file_url.startswith('file:///'):
             file_path = file_url[8:]  # Enlever file:///
-            if platform.system() == 'Windows':
+            if IS_WINDOWS:
                 file_path = file_path.replace('/', '\\')
             
             
             try:
-                if platform.system() == 'Windows':
+                if IS_WINDOWS:
                     os.startfile(file_path)
-                elif platform.system() == 'Darwin':
-                    subprocess.run(['open', file_path])
                 else:
-                    subprocess.run(['xdg-open', file_path])
+                    import subprocess  # Lazy : seulement pour open/xdg-open
+                    if IS_MAC:
+                        subprocess.run(['open', file_path])
+                    else:
+                        subprocess.run(['xdg-open', file_path])
                 
                 self.append_log(f"Opening: {os.path.basename(file_path)}", 'INFO')
             except Exception as e:
@@ -413,17 +799,18 @@ class TMGSuiteGUI(tk.Tk):
         """Efface logs"""
         self.log_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
+        self._pending_log.clear()
+        self._prune_links()
         self.log_text.config(state=tk.DISABLED)
         self.append_log("Logs cleared", 'INFO')
     
     def update_files_menu(self):
         """Met à jour les chemins dans le menu File > Files in use"""
-        gedcom = self.gedcom_path.get()
-        tmg = self.tmg_project_path.get()
+        gedcom_short = self._gedcom_short
+        tmg_short = self._tmg_short
         
         # GEDCOM
-        if gedcom:
-            gedcom_short = os.path.basename(gedcom)
+        if gedcom_short:
             self.files_menu.entryconfig(self.menu_gedcom_index, 
                                        label=f"GEDCOM: {gedcom_short}")
         else:
@@ -431,8 +818,7 @@ class TMGSuiteGUI(tk.Tk):
                                        label="GEDCOM: (not set)")
         
         # TMG Project
-        if tmg:
-            tmg_short = os.path.basename(tmg)
+        if tmg_short:
             self.files_menu.entryconfig(self.menu_tmg_index, 
                                        label=f"TMG Project: {tmg_short}")
         else:
@@ -447,44 +833,55 @@ class TMGSuiteGUI(tk.Tk):
         self.btn_role_inject.config(state=state)
         
         # Sentence injection buttons (si disponibles)
-        if sentence_injector:
+        if SENTENCE_INJECTOR_AVAILABLE:
             self.btn_inject_missing.config(state=state)
             self.btn_regenerate_all.config(state=state)
     
     # =========================================================================
     # MAPPING TOOL
     # =========================================================================
-    def run_mapping_generate(self):
-        """Lance génération Excel"""
-        if not self.gedcom_path.get() or not self.tmg_project_path.get():
+    def run_mapping_generate(self, force_rescan=False):
+        """Lance génération Excel (force_rescan : ignorer le cache du scan GEDCOM)"""
+        # Variables Tk lues une fois, ici dans le thread Tk
+        gedcom_path = self.gedcom_path.get()
+        pjc_path = self.tmg_project_path.get()
+        if not gedcom_path or not pjc_path:
             messagebox.showerror("Error", "Please configure GEDCOM and TMG Project files")
             return
         
         self.set_running_state(True)
         self.status_label.config(text="Generating Excel...")
         
-        thread = threading.Thread(target=self._run_mapping_generate_thread, daemon=True)
-        thread.start()
+        self._run_in_worker(self._run_mapping_generate_thread,
+                            gedcom_path, pjc_path, self.tmg_prefix.get(), force_rescan)
     
-    def _run_mapping_generate_thread(self):
-        """Thread génération Excel"""
+    def _run_mapping_generate_thread(self, gedcom_path, pjc_path, tmg_prefix, force_rescan=False):
+        """
+        Thread génération Excel.
+        
+        Reste dans le processus de la GUI (pas de sous-processus) : l'exe
+        PyInstaller ne peut pas relancer mapping_tool avec sys.executable,
+        le mode G de mapping_tool ouvre ses propres dialogues, et
+        mapping_tool.GEDCOM_STATS doit rester disponible pour Compile JSON
+        et Role Injection.
+        """
         try:
             self.thread_safe_log("\n" + "=" * 80, 'HEADER')
             self.thread_safe_log("MAPPING TOOL - Generate Excel", 'HEADER')
             self.thread_safe_log("=" * 80, 'HEADER')
             self.thread_safe_log("")
             
-            # Extraire dossier et préfixe depuis le chemin PJC
-            pjc_path = self.tmg_project_path.get()
+            # Extraire dossier depuis le chemin PJC
             tmg_dir = os.path.dirname(pjc_path)
-            tmg_prefix = self.tmg_prefix.get()
             
             # Appeler mapping_tool avec paramètres
+            _load_engine('mapping_tool')
             excel_path = mapping_tool.generate_excel_mode(
-                gedcom_path=self.gedcom_path.get(),
+                gedcom_path=gedcom_path,
                 tmg_project_path=tmg_dir,
                 tmg_prefix=tmg_prefix,
-                log_callback=self.thread_safe_log
+                log_callback=self.thread_safe_log,
+                force_rescan=force_rescan
             )
             
             # Afficher lien cliquable
@@ -498,13 +895,13 @@ class TMGSuiteGUI(tk.Tk):
             self.thread_safe_log("⚠️  Please validate the Excel, then click 'Compile JSON'", 'WARNING')
             
             self.excel_mapping_path = excel_path
-            self.status_label.config(text="Excel generated successfully")
+            self.thread_safe_status("Excel generated successfully")
             
         except Exception as e:
             self.thread_safe_log(f"Error: {e}", 'ERROR')
-            self.status_label.config(text="Error")
+            self.thread_safe_status("Error")
         finally:
-            self.set_running_state(False)
+            self.thread_safe_call(self.set_running_state, False)
     
     def run_mapping_compile(self):
         """Lance compilation JSON"""
@@ -518,8 +915,7 @@ class TMGSuiteGUI(tk.Tk):
         self.set_running_state(True)
         self.status_label.config(text="Compiling JSON...")
         
-        thread = threading.Thread(target=self._run_mapping_compile_thread, daemon=True)
-        thread.start()
+        self._run_in_worker(self._run_mapping_compile_thread)
     
     def _run_mapping_compile_thread(self):
         """Thread compilation JSON"""
@@ -530,6 +926,7 @@ class TMGSuiteGUI(tk.Tk):
             self.thread_safe_log("")
             
             # Appeler mapping_tool
+            _load_engine('mapping_tool')
             json_path, errors = mapping_tool.compile_json_mode(
                 excel_file=self.excel_mapping_path,
                 json_file="mapping.json",
@@ -537,20 +934,18 @@ class TMGSuiteGUI(tk.Tk):
             )
             
             if errors:
-                error_msg = f"❌ Compilation failed:\n\n{len(errors)} empty cells found:\n\n"
-                for err in errors[:5]:
-                    error_msg += f"  • {err}\n"
-                if len(errors) > 5:
-                    error_msg += f"\n  ... and {len(errors) - 5} more"
-                error_msg += "\n\nPlease complete the Excel file and try again."
+                head = f"❌ Compilation failed:\n\n{len(errors)} empty cells found:\n\n"
+                body = ''.join(f"  • {err}\n" for err in errors[:5])
+                tail = f"\n  ... and {len(errors) - 5} more" if len(errors) > 5 else ''
+                error_msg = f"{head}{body}{tail}\n\nPlease complete the Excel file and try again."
                 
                 self.thread_safe_log("Compilation failed - empty cells detected", 'ERROR')
                 
                 def show_error():
                     messagebox.showerror("Compilation Failed", error_msg)
                 
-                self.after(0, show_error)
-                self.status_label.config(text="Compilation failed")
+                self.thread_safe_call(show_error)
+                self.thread_safe_status("Compilation failed")
             else:
                 self.json_mapping_path = json_path
                 
@@ -561,18 +956,110 @@ class TMGSuiteGUI(tk.Tk):
                 def show_success():
                     messagebox.showinfo("Success", "JSON compiled successfully!\n\nReady for Role Injection.")
                 
-                self.after(0, show_success)
-                self.status_label.config(text="JSON compiled successfully")
+                self.thread_safe_call(show_success)
+                self.thread_safe_status("JSON compiled successfully")
             
         except Exception as e:
             self.thread_safe_log(f"Error: {e}", 'ERROR')
-            self.status_label.config(text="Error")
+            self.thread_safe_status("Error")
         finally:
-            self.set_running_state(False)
+            self.thread_safe_call(self.set_running_state, False)
     
     # =========================================================================
     # ROLE INJECTION
     # =========================================================================
+    def _load_mapping(self, mapping_file):
+        """mapping.json parsé, relu seulement si le fichier a changé (lecture seule)"""
+        st = os.stat(mapping_file)
+        snapshot = self._mapping_snapshot
+        if snapshot and snapshot[:3] == (mapping_file, st.st_mtime_ns, st.st_size):
+            return snapshot[3]
+        
+        with open(mapping_file, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson else json.loads(raw.decode('utf-8'))
+        self._mapping_snapshot = (mapping_file, st.st_mtime_ns, st.st_size, data)
+        return data
+    
+    def _count_witnesses(self, gedcom_path):
+        """Comptage _SHAR mémorisé pour la session tant que le GEDCOM n'a pas changé"""
+        st = os.stat(gedcom_path)
+        key = (gedcom_path, st.st_mtime_ns, st.st_size)
+        if key not in self._witness_count_cache:
+            self._witness_count_cache[key] = count_gedcom_witnesses(gedcom_path)
+        return self._witness_count_cache[key]
+    
+    def _get_role_dialog(self):
+        """Dialogue de confirmation Role Injection : construit au premier appel, masqué ensuite"""
+        if self._role_dialog is not None:
+            return self._role_dialog
+        
+        dialog = tk.Toplevel(self)
+        dialog.withdraw()
+        dialog.title("Confirm Role Injection")
+        dialog.geometry("550x400")
+        dialog.transient(self)
+        
+        self._role_dialog_vars = {key: tk.StringVar() for key in ('gedcom', 'tmg', 'prefix', 'mapping')}
+        self._role_dialog_result = tk.StringVar(value='')
+        
+        # Frame principal
+        main_frame = ttk.Frame(dialog, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Titre
+        ttk.Label(main_frame, text="ROLE INJECTION - Configuration", 
+                 font=('Arial', 12, 'bold')).pack(pady=(0, 8))
+        
+        # Configuration actuelle
+        config_frame = ttk.LabelFrame(main_frame, text="Files to use", padding=6)
+        config_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(config_frame, text="GEDCOM:", font=('Arial', 9, 'bold')).grid(row=0, column=0, sticky=tk.W, pady=1)
+        ttk.Label(config_frame, textvariable=self._role_dialog_vars['gedcom'], wraplength=450).grid(row=0, column=1, sticky=tk.W, padx=(5, 0))
+        
+        ttk.Label(config_frame, text="TMG Project:", font=('Arial', 9, 'bold')).grid(row=1, column=0, sticky=tk.W, pady=1)
+        ttk.Label(config_frame, textvariable=self._role_dialog_vars['tmg'], wraplength=450).grid(row=1, column=1, sticky=tk.W, padx=(5, 0))
+        
+        ttk.Label(config_frame, text="TMG Prefix:", font=('Arial', 9, 'bold')).grid(row=2, column=0, sticky=tk.W, pady=1)
+        ttk.Label(config_frame, textvariable=self._role_dialog_vars['prefix']).grid(row=2, column=1, sticky=tk.W, padx=(5, 0))
+        
+        ttk.Label(config_frame, text="Mapping:", font=('Arial', 9, 'bold')).grid(row=3, column=0, sticky=tk.W, pady=1)
+        ttk.Label(config_frame, textvariable=self._role_dialog_vars['mapping']).grid(row=3, column=1, sticky=tk.W, padx=(5, 0))
+        
+        # Actions
+        actions_frame = ttk.LabelFrame(main_frame, text="What will happen", padding=6)
+        actions_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(actions_frame, text="• Create automatic backup of TMG database").pack(anchor=tk.W, pady=1)
+        ttk.Label(actions_frame, text="• Scan GEDCOM for witness roles").pack(anchor=tk.W, pady=1)
+        ttk.Label(actions_frame, text="• Update TMG structure (roles in T.DBF)").pack(anchor=tk.W, pady=1)
+        ttk.Label(actions_frame, text="• Inject witnesses into TMG events").pack(anchor=tk.W, pady=1)
+        
+        # Warning
+        warning_frame = ttk.Frame(main_frame)
+        warning_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(warning_frame, text="⚠️  Make sure TMG is closed before proceeding!", 
+                 foreground='red', font=('Arial', 9, 'bold')).pack()
+        
+        # Boutons : masquer au lieu de détruire
+        def close(result):
+            dialog.grab_release()
+            dialog.withdraw()
+            self._role_dialog_result.set(result)
+        
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.pack(pady=8)
+        
+        ttk.Button(btn_frame, text="Cancel", command=lambda: close('cancel'), width=15).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Continue", command=lambda: close('ok'), width=15).pack(side=tk.LEFT, padx=5)
+        
+        dialog.protocol("WM_DELETE_WINDOW", lambda: close('cancel'))
+        
+        self._role_dialog = dialog
+        return dialog
+    
     def run_role_injection(self):
         """Lance l'injection des rôles"""
         # SÉCURITÉ : Vérifier TMG IMMÉDIATEMENT (avant toute autre vérification)
@@ -583,7 +1070,9 @@ class TMGSuiteGUI(tk.Tk):
                                "Modifying database files while TMG is open can cause corruption.")
             return
         
-        if not self.gedcom_path.get() or not self.tmg_project_path.get():
+        gedcom_path = self.gedcom_path.get()
+        pjc_path = self.tmg_project_path.get()
+        if not gedcom_path or not pjc_path:
             messagebox.showerror("Error", "Please configure GEDCOM and TMG Project files")
             return
         
@@ -619,129 +1108,60 @@ class TMGSuiteGUI(tk.Tk):
         
         # Charger mapping pour afficher stats
         try:
-            import json
-            with open(mapping_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._load_mapping(mapping_file)
             events_count = len(data.get('events', {}))
             roles_count = len(data.get('roles', {}))
         except:
             events_count = "?"
             roles_count = "?"
         
-        # Dialogue de confirmation personnalisé
-        dialog = tk.Toplevel(self)
-        dialog.title("Confirm Role Injection")
-        dialog.geometry("550x400")
-        dialog.transient(self)
-        dialog.grab_set()
-        
-        # Frame principal
-        main_frame = ttk.Frame(dialog, padding=10)
-        main_frame.pack(fill=tk.BOTH, expand=True)
+        # Dialogue de confirmation (construit une fois, ré-affiché ensuite)
+        dialog = self._get_role_dialog()
+        self._role_dialog_vars['gedcom'].set(gedcom_path)
+        self._role_dialog_vars['tmg'].set(pjc_path)
+        tmg_prefix = self.tmg_prefix.get()
+        self._role_dialog_vars['prefix'].set(tmg_prefix)
+        self._role_dialog_vars['mapping'].set(f"{events_count} events, {roles_count} roles")
+        self._role_dialog_result.set('')
         
-        # Titre
-        ttk.Label(main_frame, text="ROLE INJECTION - Configuration", 
-                 font=('Arial', 12, 'bold')).pack(pady=(0, 8))
-        
-        # Configuration actuelle
-        config_frame = ttk.LabelFrame(main_frame, text="Files to use", padding=6)
-        config_frame.pack(fill=tk.X, pady=5)
-        
-        gedcom = self.gedcom_path.get()
-        tmg = self.tmg_project_path.get()
-        prefix = self.tmg_prefix.get()
-        
-        ttk.Label(config_frame, text="GEDCOM:", font=('Arial', 9, 'bold')).grid(row=0, column=0, sticky=tk.W, pady=1)
-        ttk.Label(config_frame, text=gedcom, wraplength=450).grid(row=0, column=1, sticky=tk.W, padx=(5, 0))
-        
-        ttk.Label(config_frame, text="TMG Project:", font=('Arial', 9, 'bold')).grid(row=1, column=0, sticky=tk.W, pady=1)
-        ttk.Label(config_frame, text=tmg, wraplength=450).grid(row=1, column=1, sticky=tk.W, padx=(5, 0))
-        
-        ttk.Label(config_frame, text="TMG Prefix:", font=('Arial', 9, 'bold')).grid(row=2, column=0, sticky=tk.W, pady=1)
-        ttk.Label(config_frame, text=prefix).grid(row=2, column=1, sticky=tk.W, padx=(5, 0))
-        
-        ttk.Label(config_frame, text="Mapping:", font=('Arial', 9, 'bold')).grid(row=3, column=0, sticky=tk.W, pady=1)
-        ttk.Label(config_frame, text=f"{events_count} events, {roles_count} roles").grid(row=3, column=1, sticky=tk.W, padx=(5, 0))
-        
-        # Actions
-        actions_frame = ttk.LabelFrame(main_frame, text="What will happen", padding=6)
-        actions_frame.pack(fill=tk.X, pady=5)
-        
-        ttk.Label(actions_frame, text="• Create automatic backup of TMG database").pack(anchor=tk.W, pady=1)
-        ttk.Label(actions_frame, text="• Scan GEDCOM for witness roles").pack(anchor=tk.W, pady=1)
-        ttk.Label(actions_frame, text="• Update TMG structure (roles in T.DBF)").pack(anchor=tk.W, pady=1)
-        ttk.Label(actions_frame, text="• Inject witnesses into TMG events").pack(anchor=tk.W, pady=1)
-        
-        # Warning
-        warning_frame = ttk.Frame(main_frame)
-        warning_frame.pack(fill=tk.X, pady=5)
-        
-        ttk.Label(warning_frame, text="⚠️  Make sure TMG is closed before proceeding!", 
-                 foreground='red', font=('Arial', 9, 'bold')).pack()
-        
-        # Boutons
-        result_var = tk.BooleanVar(value=False)
-        
-        def on_ok():
-            result_var.set(True)
-            dialog.destroy()
-        
-        def on_cancel():
-            dialog.destroy()
-        
-        btn_frame = ttk.Frame(main_frame)
-        btn_frame.pack(pady=8)
-        
-        ttk.Button(btn_frame, text="Cancel", command=on_cancel, width=15).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Continue", command=on_ok, width=15).pack(side=tk.LEFT, padx=5)
+        dialog.deiconify()
+        dialog.grab_set()
+        dialog.focus_set()
         
-        # Attendre fermeture
-        self.wait_window(dialog)
+        # Attendre le choix (le dialogue est masqué, pas détruit)
+        self.wait_variable(self._role_dialog_result)
         
         # Si annulé
-        if not result_var.get():
+        if self._role_dialog_result.get() != 'ok':
             return
         
         # Lancer le scan pour compter les témoins
         self.set_running_state(True)
         self.status_label.config(text="Scanning GEDCOM...")
         
-        thread = threading.Thread(target=self._scan_and_confirm_role_injection, daemon=True)
-        thread.start()
+        # Chemins lus ici (thread Tk) et transmis au thread de travail
+        self._run_in_worker(self._scan_and_confirm_role_injection,
+                            gedcom_path, os.path.dirname(pjc_path), tmg_prefix)
     
-    def _scan_and_confirm_role_injection(self):
+    def _scan_and_confirm_role_injection(self, gedcom_path, tmg_dir, tmg_prefix):
         """Scan GEDCOM, affiche stats, demande dry-run, puis lance injection"""
         try:
-            pjc_path = self.tmg_project_path.get()
-            tmg_dir = os.path.dirname(pjc_path)
-            tmg_prefix = self.tmg_prefix.get()
-            gedcom_path = self.gedcom_path.get()
-            
             self.thread_safe_log("\n" + "=" * 80, 'HEADER')
             self.thread_safe_log("ROLE INJECTION - SCAN", 'HEADER')
             self.thread_safe_log("=" * 80, 'HEADER')
             self.thread_safe_log("")
             
-            # Charger mapping
-            import json
-            with open("mapping.json", 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Charger mapping (snapshot déjà lu par run_role_injection)
+            data = self._load_mapping("mapping.json")
             
             # Scanner rapidement pour compter
             self.thread_safe_log("Scanning GEDCOM to count witnesses...", 'INFO')
             
-            # Compter les _SHAR dans le GEDCOM
-            witness_count = 0
-            try:
-                with open(gedcom_path, 'r', encoding='ansi') as f:
-                    for line in f:
-                        if '_SHAR @' in line:
-                            witness_count += 1
-            except:
-                with open(gedcom_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if '_SHAR @' in line:
-                            witness_count += 1
+            # Compter les _SHAR : repris du scan mapping_tool si le GEDCOM n'a pas
+            # changé, sinon scan binaire (octets bruts : ANSI ou UTF-8)
+            witness_count = cached_witness_count(data, gedcom_path)
+            if witness_count is None:
+                witness_count = self._count_witnesses(gedcom_path)
             
             self.thread_safe_log(f"✓ Found {witness_count} witness references in GEDCOM", 'SUCCESS')
             self.thread_safe_log("")
@@ -806,31 +1226,22 @@ class TMGSuiteGUI(tk.Tk):
                 self.wait_window(dialog)
                 return choice.get()
             
-            # Afficher dialogue dans main thread
-            choice = [None]
-            def show():
-                choice[0] = show_dryrun_dialog()
-            
-            self.after(0, show)
+            # Afficher dialogue dans main thread et attendre le choix
+            choice = self._call_and_wait(show_dryrun_dialog)
             
-            # Attendre choix
-            import time
-            while choice[0] is None:
-                time.sleep(0.1)
-            
-            if choice[0] == "cancel":
+            # Fermeture par la croix ou erreur du dialogue = annulation
+            if choice not in ("dryrun", "real"):
                 self.thread_safe_log("✗ Injection cancelled by user", 'WARNING')
-                self.status_label.config(text="Cancelled")
-                self.set_running_state(False)
+                self.thread_safe_status("Cancelled")
+                self.thread_safe_call(self.set_running_state, False)
                 return
             
-            dry_run = (choice[0] == "dryrun")
+            dry_run = (choice == "dryrun")
             
             # Si mode REAL, dernière confirmation
             if not dry_run:
-                confirm = [None]
                 def show_final_warning():
-                    result = messagebox.askyesno(
+                    return messagebox.askyesno(
                         "⚠️ FINAL WARNING",
                         f"You are about to MODIFY your TMG database!\n\n" +
                         f"• {witness_count} witnesses will be injected\n" +
@@ -840,154 +1251,82 @@ class TMGSuiteGUI(tk.Tk):
                         f"Continue with REAL injection?",
                         icon='warning'
                     )
-                    confirm[0] = result
-                
-                self.after(0, show_final_warning)
-                
-                while confirm[0] is None:
-                    time.sleep(0.1)
                 
-                if not confirm[0]:
+                if not self._call_and_wait(show_final_warning):
                     self.thread_safe_log("✗ Injection cancelled at final confirmation", 'WARNING')
-                    self.status_label.config(text="Cancelled")
-                    self.set_running_state(False)
+                    self.thread_safe_status("Cancelled")
+                    self.thread_safe_call(self.set_running_state, False)
                     return
             
             # Lancer injection
-            mode = "SIMULATION" if dry_run else "REAL"
-            self.status_label.config(text=f"Injecting roles ({mode})...")
-            
-            self.thread_safe_log("\n" + "=" * 80, 'HEADER')
-            self.thread_safe_log(f"ROLE INJECTION - {mode}", 'HEADER')
-            self.thread_safe_log("=" * 80, 'HEADER')
-            self.thread_safe_log("")
+            self._role_injection_core(dry_run, tmg_dir, tmg_prefix, gedcom_path)
             
-            if dry_run:
-                self.thread_safe_log("⚠️  DRY-RUN MODE: No changes will be made to TMG files", 'WARNING')
-                self.thread_safe_log("")
-            else:
-                self.thread_safe_log("⏱️  Injection may take several minutes. Please be patient...", 'INFO')
-                self.thread_safe_log("   The interface may appear frozen but is working.", 'INFO')
-                self.thread_safe_log("")
-            
-            # Appeler role_injector directement (on est déjà dans un thread)
-            result = role_injector.inject_roles_mode(
-                gedcom_path=gedcom_path,
-                tmg_project_path=tmg_dir,
-                tmg_prefix=tmg_prefix,
-                mapping_file="mapping.json",
-                log_callback=self.thread_safe_log,
-                dry_run=dry_run
-            )
-            
-            if result.get('success'):
-                self.thread_safe_log("")
-                self.thread_safe_log("✓ Role injection completed!", 'SUCCESS')
-                self.thread_safe_log(f"Log file: {result.get('log_file', '')}", 'INFO')
-                
-                def show_success():
-                    if not dry_run:
-                        self.thread_safe_log("⚠️  IMPORTANT: Open TMG and run File > Maintenance > Reindex", 'WARNING')
-                        messagebox.showinfo("Success", 
-                                          "Role injection completed!\n\n" +
-                                          "Remember to reindex in TMG:\n" +
-                                          "File > Maintenance > Reindex")
-                    else:
-                        messagebox.showinfo("Dry-run Complete", 
-                                          "Simulation completed successfully!\n\n" +
-                                          "No changes were made to TMG database.\n\n" +
-                                          "Review the log file.\n" +
-                                          "If satisfied, return to Real mode to apply.")
-                
-                self.after(0, show_success)
-                self.status_label.config(text=f"Role injection completed ({mode})")
-            else:
-                error = result.get('error', 'Unknown error')
-                self.thread_safe_log(f"✗ Role injection failed: {error}", 'ERROR')
-                
-                def show_error():
-                    messagebox.showerror("Error", f"Role injection failed:\n\n{error}")
-                
-                self.after(0, show_error)
-                self.status_label.config(text="Role injection failed")
-            
-            self.set_running_state(False)
+            self.thread_safe_call(self.set_running_state, False)
             
         except Exception as e:
             self.thread_safe_log(f"Error during scan: {e}", 'ERROR')
             import traceback
             traceback.print_exc()
-            self.set_running_state(False)
+            self.thread_safe_call(self.set_running_state, False)
     
-    def _run_role_injection_thread(self, dry_run=False):
-        """Thread d'exécution injection rôles"""
-        try:
-            mode = "SIMULATION" if dry_run else "REAL"
-            self.status_label.config(text=f"Injecting roles ({mode})...")
-            
-            self.append_log("\n" + "=" * 80, 'HEADER')
-            self.append_log(f"ROLE INJECTION - {mode}", 'HEADER')
-            self.append_log("=" * 80, 'HEADER')
-            self.append_log("")
-            
-            if dry_run:
-                self.append_log("⚠️  DRY-RUN MODE: No changes will be made to TMG files", 'WARNING')
-                self.append_log("")
-            
-            # Extraire paramètres
-            pjc_path = self.tmg_project_path.get()
-            tmg_dir = os.path.dirname(pjc_path)
-            tmg_prefix = self.tmg_prefix.get()
-            gedcom_path = self.gedcom_path.get()
+    def _role_injection_core(self, dry_run, tmg_dir, tmg_prefix, gedcom_path):
+        """Injection des rôles + compte rendu (appelé depuis un thread de travail)"""
+        mode = "SIMULATION" if dry_run else "REAL"
+        self.thread_safe_status(f"Injecting roles ({mode})...")
+        
+        self.thread_safe_log("\n" + "=" * 80, 'HEADER')
+        self.thread_safe_log(f"ROLE INJECTION - {mode}", 'HEADER')
+        self.thread_safe_log("=" * 80, 'HEADER')
+        self.thread_safe_log("")
+        
+        if dry_run:
+            self.thread_safe_log("⚠️  DRY-RUN MODE: No changes will be made to TMG files", 'WARNING')
+            self.thread_safe_log("")
+        else:
+            self.thread_safe_log("⏱️  Injection may take several minutes. Please be patient...", 'INFO')
+            self.thread_safe_log("   The interface may appear frozen but is working.", 'INFO')
+            self.thread_safe_log("")
+        
+        # Appeler role_injector directement (on est déjà dans un thread)
+        result = role_injector.inject_roles_mode(
+            gedcom_path=gedcom_path,
+            tmg_project_path=tmg_dir,
+            tmg_prefix=tmg_prefix,
+            mapping_file="mapping.json",
+            log_callback=self.thread_safe_log,
+            dry_run=dry_run
+        )
+        
+        if result.get('success'):
+            self.thread_safe_log("")
+            self.thread_safe_log("✓ Role injection completed!", 'SUCCESS')
+            self.thread_safe_log(f"Log file: {result.get('log_file', '')}", 'INFO')
             
-            # Appeler role_injector
-            result = role_injector.inject_roles_mode(
-                gedcom_path=gedcom_path,
-                tmg_project_path=tmg_dir,
-                tmg_prefix=tmg_prefix,
-                mapping_file="mapping.json",
-                log_callback=self.thread_safe_log,
-                dry_run=dry_run
-            )
+            def show_success():
+                if not dry_run:
+                    self.thread_safe_log("⚠️  IMPORTANT: Open TMG and run File > Maintenance > Reindex", 'WARNING')
+                    messagebox.showinfo("Success", 
+                                      "Role injection completed!\n\n" +
+                                      "Remember to reindex in TMG:\n" +
+                                      "File > Maintenance > Reindex")
+                else:
+                    messagebox.showinfo("Dry-run Complete", 
+                                      "Simulation completed successfully!\n\n" +
+                                      "No changes were made to TMG database.\n\n" +
+                                      "Review the log file.\n" +
+                                      "If satisfied, return to Real mode to apply.")
+            
+            self.thread_safe_call(show_success)
+            self.thread_safe_status(f"Role injection completed ({mode})")
+        else:
+            error = result.get('error', 'Unknown error')
+            self.thread_safe_log(f"✗ Role injection failed: {error}", 'ERROR')
             
-            if result.get('success'):
-                self.append_log("")
-                self.append_log("✓ Role injection completed!", 'SUCCESS')
-                self.append_log(f"Log file: {result.get('log_file', '')}", 'INFO')
-                
-                def show_success():
-                    if not dry_run:
-                        self.append_log("⚠️  IMPORTANT: Open TMG and run File > Maintenance > Reindex", 'WARNING')
-                        messagebox.showinfo("Success", 
-                                          "Role injection completed!\n\n" +
-                                          "Remember to reindex in TMG:\n" +
-                                          "File > Maintenance > Reindex")
-                    else:
-                        messagebox.showinfo("Dry-run Complete", 
-                                          "Simulation completed successfully!\n\n" +
-                                          "No changes were made to TMG database.\n\n" +
-                                          "Review the log file.\n" +
-                                          "If satisfied, return to Real mode to apply.")
-                
-                self.after(0, show_success)
-                self.status_label.config(text=f"Role injection completed ({mode})")
-            else:
-                error = result.get('error', 'Unknown error')
-                self.append_log(f"✗ Role injection failed: {error}", 'ERROR')
-                
-                def show_error():
-                    messagebox.showerror("Error", f"Role injection failed:\n\n{error}")
-                
-                self.after(0, show_error)
-                self.status_label.config(text="Role injection failed")
+            def show_error():
+                messagebox.showerror("Error", f"Role injection failed:\n\n{error}")
             
-        except Exception as e:
-            self.append_log(f"Error: {e}", 'ERROR')
-            import traceback
-            traceback.print_exc()
-            self.status_label.config(text="Error")
-        finally:
-            self.set_running_state(False)
+            self.thread_safe_call(show_error)
+            self.thread_safe_status("Role injection failed")
     
     # =========================================================================
     # SENTENCE INJECTION
@@ -1002,37 +1341,49 @@ class TMGSuiteGUI(tk.Tk):
             self.tag_selector_frame.pack(side=tk.LEFT, padx=5)
     
     def load_custom_tags(self):
-        """Charge la liste des tags custom"""
-        if not self.tmg_project_path.get():
+        """Charge la liste des tags custom (scan T.DBF dans un thread)"""
+        pjc_path = self.tmg_project_path.get()
+        if not pjc_path:
             messagebox.showerror("Error", "Please configure TMG Project first")
             return
         
+        # Extraire dossier et préfixe
+        tmg_dir = os.path.dirname(pjc_path)
+        tmg_prefix = self.tmg_prefix.get()
+        
+        self.status_label.config(text="Loading custom tags...")
+        
+        self._run_in_worker(self._load_custom_tags_thread, tmg_dir, tmg_prefix)
+    
+    def _load_custom_tags_thread(self, tmg_dir, tmg_prefix):
+        """Thread lecture des tags custom - résultat renvoyé au thread Tk"""
         try:
-            # Extraire dossier et préfixe
-            pjc_path = self.tmg_project_path.get()
-            tmg_dir = os.path.dirname(pjc_path)
-            tmg_prefix = self.tmg_prefix.get()
-            
             # Appeler sentence_injector pour lister les tags
+            _load_engine('sentence_injector')
             custom_tags = sentence_injector.list_custom_tags_mode(
                 tmg_project_path=tmg_dir,
                 tmg_prefix=tmg_prefix
             )
-            
-            if custom_tags:
-                # Trier alphabétiquement
-                custom_tags_sorted = sorted(custom_tags, key=lambda x: x['ETYPENAME'].upper())
-                tag_names = [tag['ETYPENAME'] for tag in custom_tags_sorted]
-                
-                self.tag_combo['values'] = tag_names
-                if tag_names:
-                    self.tag_combo.current(0)
-                self.custom_tags = custom_tags_sorted  # Stocker la version triée
-            else:
-                messagebox.showwarning("Warning", "No custom tags found")
-                
+            self.thread_safe_call(self._on_custom_tags_loaded, custom_tags)
         except Exception as e:
-            messagebox.showerror("Error", f"Cannot load tags: {e}")
+            self.thread_safe_call(messagebox.showerror, "Error", f"Cannot load tags: {e}")
+            self.thread_safe_status("Error")
+    
+    def _on_custom_tags_loaded(self, custom_tags):
+        """Remplit le sélecteur de tags (thread Tk)"""
+        self.status_label.config(text="Ready")
+        if custom_tags:
+            # Trier alphabétiquement
+            custom_tags_sorted = sorted(custom_tags, key=lambda x: x['ETYPENAME'].upper())
+            tag_names = [tag['ETYPENAME'] for tag in custom_tags_sorted]
+            
+            self.tag_combo['values'] = tag_names
+            if tag_names:
+                self.tag_combo.current(0)
+            self.custom_tags = custom_tags_sorted  # Stocker la version triée
+            self._tags_by_name = {tag['ETYPENAME']: tag for tag in custom_tags_sorted}
+        else:
+            messagebox.showwarning("Warning", "No custom tags found")
     
     def run_sentence_inject_one(self):
         """Lance injection pour UN tag"""
@@ -1050,11 +1401,7 @@ class TMGSuiteGUI(tk.Tk):
         
         # Trouver le tag sélectionné
         selected_name = self.tag_var.get()
-        selected_tag = None
-        for tag in self.custom_tags:
-            if tag['ETYPENAME'] == selected_name:
-                selected_tag = tag
-                break
+        selected_tag = self._tags_by_name.get(selected_name)
         
         if not selected_tag:
             messagebox.showerror("Error", "Tag not found")
@@ -1063,18 +1410,13 @@ class TMGSuiteGUI(tk.Tk):
         self.set_running_state(True)
         self.status_label.config(text=f"Injecting sentences for {selected_name}...")
         
-        thread = threading.Thread(target=self._run_sentence_inject_one_thread, 
-                                 args=(selected_tag,), daemon=True)
-        thread.start()
+        # Chemins lus ici (thread Tk) et transmis au thread de travail
+        self._run_in_worker(self._run_sentence_inject_one_thread, selected_tag,
+                            os.path.dirname(self.tmg_project_path.get()), self.tmg_prefix.get())
     
-    def _run_sentence_inject_one_thread(self, tag):
+    def _run_sentence_inject_one_thread(self, tag, tmg_dir, tmg_prefix):
         """Thread pour afficher dialogue et injection UN tag"""
         try:
-            # Extraire dossier et préfixe
-            pjc_path = self.tmg_project_path.get()
-            tmg_dir = os.path.dirname(pjc_path)
-            tmg_prefix = self.tmg_prefix.get()
-            
             # Parser TSENTENCE (déjà chargé dans le tag)
             tsentence_str = tag.get('TSENTENCE', '')
             
@@ -1083,21 +1425,24 @@ class TMGSuiteGUI(tk.Tk):
                 return
             
             # Parser avec la fonction de sentence_injector
+            _load_engine('sentence_injector')
             roles_data = sentence_injector.parse_tsentence(tsentence_str)
             
             # Construire tag_info
             tag_info = {'roles': {}}
             for rid, data in roles_data.items():
-                role_name = data['role'].get('ENGLISHUK', data['role'].get('ENGLISH', f"Role {rid}"))
+                role_name = data['role'].get('ENGLISHUK') or data['role'].get('ENGLISH') or f"Role {rid}"
                 has_phrase = bool(data['phrase'].get('ENGLISHUK') or data['phrase'].get('ENGLISH'))
                 
                 tag_info['roles'][rid] = {
                     'name': role_name,
-                    'has_phrase': has_phrase
+                    'has_phrase': has_phrase,
+                    # Même règle que l'injection (aperçu = phrase écrite)
+                    'is_principal': sentence_injector._is_principal(role_name)
                 }
             
             # Afficher dialogue avec les résultats
-            self.after(0, lambda: self._show_tag_injection_dialog(tag, tag_info, tmg_dir, tmg_prefix))
+            self.thread_safe_call(self._show_tag_injection_dialog, tag, tag_info, tmg_dir, tmg_prefix)
             
         except Exception as e:
             print(f"Exception in analyze: {e}")
@@ -1105,7 +1450,7 @@ class TMGSuiteGUI(tk.Tk):
             traceback.print_exc()
             self.thread_safe_log(f"Error analyzing tag: {e}", 'ERROR')
         finally:
-            self.set_running_state(False)
+            self.thread_safe_call(self.set_running_state, False)
     
     def _show_tag_injection_dialog(self, tag, tag_info, tmg_dir, tmg_prefix):
         """Affiche dialogue SIMPLE pour confirmer injection"""
@@ -1144,86 +1489,134 @@ class TMGSuiteGUI(tk.Tk):
             self.append_log(f"Skipped tag: {tag['ETYPENAME']}", 'INFO')
         
         def on_inject():
+            # Rien à injecter : ne pas ouvrir T.DBF pour zéro écriture
+            if missing == 0:
+                messagebox.showinfo("Info", f"{tag['ETYPENAME']} has no missing sentences.",
+                                    parent=dialog)
+                return
+            
             # Générer aperçu des phrases à injecter
-            preview = f"PREVIEW - Sentences to inject:\n\n"
+            parts = ["PREVIEW - Sentences to inject:\n\n"]
             count = 0
             
             for role_id, info in sorted(tag_info['roles'].items()):
                 if not info['has_phrase']:  # Phrase manquante
                     role_name = info['name']
-                    is_principal = 'principal' in role_name.lower()
                     
                     # Générer phrases
                     phrase_en, phrase_fr = sentence_injector.generate_phrase(
-                        tag['ETYPENAME'], role_name, is_principal
+                        tag['ETYPENAME'], role_name, info['is_principal']
                     )
                     
                     count += 1
-                    preview += f"[{role_id:05d}] {role_name}\n"
-                    preview += f"  EN: {phrase_en}\n"
-                    preview += f"  FR: {phrase_fr}\n\n"
+                    parts.append(f"[{role_id:05d}] {role_name}\n  EN: {phrase_en}\n  FR: {phrase_fr}\n\n")
             
-            # Confirmation avec aperçu
-            if messagebox.askyesno("Confirm Injection",
-                                  preview + f"Inject {count} sentence(s)?",
-                                  parent=dialog):
+            def confirm():
                 dialog.destroy()
                 self._execute_tag_injection(tag, tmg_dir, tmg_prefix, override=False)
+            
+            # Confirmation avec aperçu
+            self._show_preview_dialog("Confirm Injection", parts,
+                                      f"Inject {count} sentence(s)?", confirm, parent=dialog)
         
         def on_regenerate():
             # Générer aperçu de TOUTES les phrases
-            preview = f"⚠️ REGENERATE ALL - All sentences will be replaced:\n\n"
+            parts = ["⚠️ REGENERATE ALL - All sentences will be replaced:\n\n"]
             count = 0
             
             for role_id, info in sorted(tag_info['roles'].items()):
                 role_name = info['name']
-                is_principal = 'principal' in role_name.lower()
                 
                 # Générer phrases
                 phrase_en, phrase_fr = sentence_injector.generate_phrase(
-                    tag['ETYPENAME'], role_name, is_principal
+                    tag['ETYPENAME'], role_name, info['is_principal']
                 )
                 
                 count += 1
                 status = "REPLACE" if info['has_phrase'] else "NEW"
-                preview += f"[{role_id:05d}] {role_name} [{status}]\n"
-                preview += f"  EN: {phrase_en}\n"
-                preview += f"  FR: {phrase_fr}\n\n"
+                parts.append(f"[{role_id:05d}] {role_name} [{status}]\n  EN: {phrase_en}\n  FR: {phrase_fr}\n\n")
             
-            # Confirmation avec aperçu
-            if messagebox.askyesno("⚠️ Confirm Regeneration",
-                                  preview + f"⚠️ Regenerate {count} sentence(s)?\n\nExisting sentences will be REPLACED!",
-                                  parent=dialog):
+            def confirm():
                 dialog.destroy()
                 self._execute_tag_injection(tag, tmg_dir, tmg_prefix, override=True)
+            
+            # Confirmation avec aperçu
+            self._show_preview_dialog("⚠️ Confirm Regeneration", parts,
+                                      f"⚠️ Regenerate {count} sentence(s)? Existing sentences will be REPLACED!",
+                                      confirm, parent=dialog)
         
         ttk.Button(btn_frame, text="Skip", command=on_skip).pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
         ttk.Button(btn_frame, text="Inject Missing", command=on_inject).pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
         ttk.Button(btn_frame, text="Regenerate ALL", command=on_regenerate).pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
     
+    def _show_preview_dialog(self, title, entries, question, on_confirm, parent=None):
+        """
+        Aperçu dans une zone de texte défilante + Oui/Non.
+        Les entrées sont insérées par lots (after_idle) : le dialogue s'ouvre
+        tout de suite, même pour des milliers de phrases.
+        """
+        parent = parent or self
+        preview = tk.Toplevel(parent)
+        preview.title(title)
+        preview.geometry("650x500")
+        preview.transient(parent)
+        preview.grab_set()
+        
+        main_frame = ttk.Frame(preview, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        text = scrolledtext.ScrolledText(main_frame, wrap=tk.WORD, height=20,
+                                         font=('Consolas', 9), undo=False)
+        text.pack(fill=tk.BOTH, expand=True)
+        
+        counter = ttk.Label(main_frame, text="")
+        counter.pack(anchor=tk.W, pady=(4, 0))
+        ttk.Label(main_frame, text=question, font=('Arial', 10, 'bold'),
+                  wraplength=600).pack(pady=6)
+        
+        total = len(entries)
+        
+        def insert_batch(start=0):
+            if not text.winfo_exists():
+                return
+            end = min(start + self._PREVIEW_BATCH, total)
+            text.config(state=tk.NORMAL)
+            text.insert(tk.END, ''.join(entries[start:end]))
+            text.config(state=tk.DISABLED)
+            counter.config(text=f"{end}/{total} shown")
+            if end < total:
+                preview.after_idle(insert_batch, end)
+        
+        def on_yes():
+            preview.destroy()
+            on_confirm()
+        
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.pack()
+        ttk.Button(btn_frame, text="No", command=preview.destroy, width=12).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Yes", command=on_yes, width=12).pack(side=tk.LEFT, padx=5)
+        
+        insert_batch()
+    
     def _execute_tag_injection(self, tag, tmg_dir, tmg_prefix, override):
         """Exécute l'injection pour un tag"""
         self.set_running_state(True)
         mode = "REGENERATE" if override else "INJECT MISSING"
         self.status_label.config(text=f"{mode} for {tag['ETYPENAME']}...")
         
-        thread = threading.Thread(
-            target=self._execute_tag_injection_thread,
-            args=(tag, tmg_dir, tmg_prefix, override),
-            daemon=True
-        )
-        thread.start()
+        self._run_in_worker(self._execute_tag_injection_thread, tag, tmg_dir, tmg_prefix, override)
     
     def _execute_tag_injection_thread(self, tag, tmg_dir, tmg_prefix, override):
         """Thread d'exécution injection"""
         try:
             mode = "REGENERATE ALL" if override else "INJECT MISSING"
-            self.append_log("\n" + "=" * 80, 'HEADER')
-            self.append_log(f"SENTENCE INJECTION - {tag['ETYPENAME']} - {mode}", 'HEADER')
-            self.append_log("=" * 80, 'HEADER')
-            self.append_log("")
+            self.thread_safe_log("\n" + "=" * 80, 'HEADER')
+            self.thread_safe_log(f"SENTENCE INJECTION - {tag['ETYPENAME']} - {mode}", 'HEADER')
+            self.thread_safe_log("=" * 80, 'HEADER')
+            self.thread_safe_log("")
             
             # Appeler sentence_injector
+            _load_engine('sentence_injector')
             stats = sentence_injector.inject_single_tag_mode(
                 tag=tag,
                 tmg_project_path=tmg_dir,
@@ -1233,20 +1626,20 @@ class TMGSuiteGUI(tk.Tk):
                 language='EN'
             )
             
-            self.append_log("")
-            self.append_log(f"✓ Tag processed", 'SUCCESS')
-            self.append_log("⚠️  IMPORTANT: Open TMG and run File > Maintenance > Reindex", 'WARNING')
+            self.thread_safe_log("")
+            self.thread_safe_log(f"✓ Tag processed", 'SUCCESS')
+            self.thread_safe_log("⚠️  IMPORTANT: Open TMG and run File > Maintenance > Reindex", 'WARNING')
             
-            messagebox.showinfo("Success", 
-                              f"Sentences processed for {tag['ETYPENAME']}!\n\n" +
-                              "Remember to reindex in TMG.")
-            self.status_label.config(text="Injection completed")
+            self.thread_safe_call(messagebox.showinfo, "Success", 
+                                  f"Sentences processed for {tag['ETYPENAME']}!\n\n" +
+                                  "Remember to reindex in TMG.")
+            self.thread_safe_status("Injection completed")
             
         except Exception as e:
-            self.append_log(f"Error: {e}", 'ERROR')
-            self.status_label.config(text="Error")
+            self.thread_safe_log(f"Error: {e}", 'ERROR')
+            self.thread_safe_status("Error")
         finally:
-            self.set_running_state(False)
+            self.thread_safe_call(self.set_running_state, False)
     
     def run_sentence_inject_missing(self):
         """Lance injection phrases manquantes (tous tags)"""
@@ -1258,16 +1651,17 @@ class TMGSuiteGUI(tk.Tk):
                                "Modifying database files while TMG is open can cause corruption.")
             return
         
-        if not self.tmg_project_path.get():
+        pjc_path = self.tmg_project_path.get()
+        if not pjc_path:
             messagebox.showerror("Error", "Please configure TMG Project")
             return
         
         # Charger tous les tags
         try:
-            pjc_path = self.tmg_project_path.get()
             tmg_dir = os.path.dirname(pjc_path)
             tmg_prefix = self.tmg_prefix.get()
             
+            _load_engine('sentence_injector')
             custom_tags = sentence_injector.list_custom_tags_mode(
                 tmg_project_path=tmg_dir,
                 tmg_prefix=tmg_prefix
@@ -1299,40 +1693,33 @@ class TMGSuiteGUI(tk.Tk):
                 return
             
             # Construire message aperçu
-            preview = f"INJECT MISSING - Preview\n\n"
-            preview += f"Tags with missing sentences: {len(tags_with_missing)}\n"
-            preview += f"Total sentences to inject: {total_missing}\n\n"
-            preview += "Tags:\n"
+            parts = [
+                "INJECT MISSING - Preview\n\n",
+                f"Tags with missing sentences: {len(tags_with_missing)}\n",
+                f"Total sentences to inject: {total_missing}\n\n",
+                "Tags:\n",
+            ]
             
             for item in tags_with_missing[:10]:  # Montrer 10 premiers
-                tag_name = item['tag']['ETYPENAME']
-                preview += f"  • {tag_name}: {item['missing']} sentence(s)\n"
+                parts.append(f"  • {item['tag']['ETYPENAME']}: {item['missing']} sentence(s)\n")
             
             if len(tags_with_missing) > 10:
-                preview += f"  ... and {len(tags_with_missing) - 10} more tags\n"
+                parts.append(f"  ... and {len(tags_with_missing) - 10} more tags\n")
             
-            preview += f"\nProceed with injection?"
+            preview = ''.join(parts)
             
-            result = messagebox.askyesno("Confirm Injection", preview)
-            if not result:
-                return
-            
-            # SECOND WARNING
-            result2 = messagebox.askyesno("⚠️ Final Confirmation",
-                                         f"You are about to inject {total_missing} sentences in {len(tags_with_missing)} tags.\n\n" +
-                                         "Do you REALLY want to proceed?\n\n" +
-                                         "Note: Restoring from backup is NOT easy!",
-                                         icon='warning')
-            if not result2:
+            # Confirmation unique : aperçu + avertissement + case à cocher
+            if not self._confirm_destructive(
+                    "⚠️ Confirm Injection", preview,
+                    f"You are about to inject {total_missing} sentences in {len(tags_with_missing)} tags.\n" +
+                    "Note: Restoring from backup is NOT easy!"):
                 return
             
             # Lancer injection
             self.set_running_state(True)
             self.status_label.config(text="Injecting missing sentences...")
             
-            thread = threading.Thread(target=self._run_sentence_inject_all_thread, 
-                                     args=(False,), daemon=True)
-            thread.start()
+            self._run_in_worker(self._run_sentence_inject_all_thread, False, tmg_dir, tmg_prefix)
             
         except Exception as e:
             messagebox.showerror("Error", f"Cannot analyze tags: {e}")
@@ -1347,16 +1734,17 @@ class TMGSuiteGUI(tk.Tk):
                                "Modifying database files while TMG is open can cause corruption.")
             return
         
-        if not self.tmg_project_path.get():
+        pjc_path = self.tmg_project_path.get()
+        if not pjc_path:
             messagebox.showerror("Error", "Please configure TMG Project")
             return
         
         # Charger tous les tags
         try:
-            pjc_path = self.tmg_project_path.get()
             tmg_dir = os.path.dirname(pjc_path)
             tmg_prefix = self.tmg_prefix.get()
             
+            _load_engine('sentence_injector')
             custom_tags = sentence_injector.list_custom_tags_mode(
                 tmg_project_path=tmg_dir,
                 tmg_prefix=tmg_prefix
@@ -1382,37 +1770,69 @@ class TMGSuiteGUI(tk.Tk):
             preview += f"Total sentences to regenerate: {total_sentences}\n\n"
             preview += "⚠️ ALL existing sentences will be REPLACED!\n"
             preview += "⚠️ Custom sentences will be LOST!\n"
-            preview += "✓ Automatic backup will be created\n\n"
-            preview += f"Proceed with regeneration?"
-            
-            result = messagebox.askyesno("⚠️ Confirm Regeneration", preview, icon='warning')
-            if not result:
-                return
-            
-            # SECOND WARNING
-            result2 = messagebox.askyesno("⚠️⚠️ FINAL CONFIRMATION",
-                                         f"LAST CHANCE TO CANCEL!\n\n" +
-                                         f"You will REGENERATE {total_sentences} sentences in {total_tags} tags.\n\n" +
-                                         "⚠️ ALL existing sentences will be REPLACED!\n" +
-                                         "⚠️ Custom sentences will be PERMANENTLY LOST!\n\n" +
-                                         "Restoring from backup is NOT easy!\n\n" +
-                                         "Do you REALLY want to proceed?",
-                                         icon='warning')
-            if not result2:
+            preview += "✓ Automatic backup will be created"
+            
+            # Confirmation unique : aperçu + avertissement + case à cocher
+            if not self._confirm_destructive(
+                    "⚠️ Confirm Regeneration", preview,
+                    f"You will REGENERATE {total_sentences} sentences in {total_tags} tags.\n" +
+                    "⚠️ Custom sentences will be PERMANENTLY LOST!\n" +
+                    "Restoring from backup is NOT easy!"):
                 return
             
             # Lancer régénération
             self.set_running_state(True)
             self.status_label.config(text="Regenerating ALL sentences...")
             
-            thread = threading.Thread(target=self._run_sentence_inject_all_thread, 
-                                     args=(True,), daemon=True)
-            thread.start()
+            self._run_in_worker(self._run_sentence_inject_all_thread, True, tmg_dir, tmg_prefix)
             
         except Exception as e:
             messagebox.showerror("Error", f"Cannot analyze tags: {e}")
     
-    def _run_sentence_inject_all_thread(self, override):
+    def _confirm_destructive(self, title, preview_text, warning_text):
+        """
+        Confirmation d'une opération destructive en un seul dialogue :
+        « Proceed » n'est actif qu'une fois la case « I understand » cochée.
+        Retourne True si l'utilisateur confirme.
+        """
+        dialog = tk.Toplevel(self)
+        dialog.title(title)
+        dialog.transient(self)
+        dialog.grab_set()
+        
+        main_frame = ttk.Frame(dialog, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(main_frame, text=preview_text, justify=tk.LEFT).pack(anchor=tk.W)
+        ttk.Label(main_frame, text=warning_text, justify=tk.LEFT, foreground='red',
+                  font=('Arial', 9, 'bold')).pack(anchor=tk.W, pady=8)
+        
+        confirmed = tk.BooleanVar(value=False)
+        understood = tk.BooleanVar(value=False)
+        
+        btn_frame = ttk.Frame(main_frame)
+        
+        def on_proceed():
+            confirmed.set(True)
+            dialog.destroy()
+        
+        proceed_btn = ttk.Button(btn_frame, text="Proceed", command=on_proceed,
+                                 width=15, state=tk.DISABLED)
+        
+        def on_toggle():
+            proceed_btn.config(state=tk.NORMAL if understood.get() else tk.DISABLED)
+        
+        ttk.Checkbutton(main_frame, text="I understand, proceed anyway",
+                        variable=understood, command=on_toggle).pack(anchor=tk.W)
+        
+        btn_frame.pack(pady=6)
+        ttk.Button(btn_frame, text="Cancel", command=dialog.destroy, width=15).pack(side=tk.LEFT, padx=5)
+        proceed_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.wait_window(dialog)
+        return confirmed.get()
+    
+    def _run_sentence_inject_all_thread(self, override, tmg_dir, tmg_prefix):
         """Thread injection TOUS les tags"""
         try:
             mode = "REGENERATE ALL" if override else "INJECT MISSING"
@@ -1421,18 +1841,17 @@ class TMGSuiteGUI(tk.Tk):
             self.thread_safe_log("=" * 80, 'HEADER')
             self.thread_safe_log("")
             
-            # Extraire dossier et préfixe
-            pjc_path = self.tmg_project_path.get()
-            tmg_dir = os.path.dirname(pjc_path)
-            tmg_prefix = self.tmg_prefix.get()
-            
             # Appeler sentence_injector
+            _load_engine('sentence_injector')
             stats = sentence_injector.inject_all_tags_mode(
                 tmg_project_path=tmg_dir,
                 tmg_prefix=tmg_prefix,
                 override=override,
                 log_callback=self.thread_safe_log,
-                language='EN'
+                language='EN',
+                batch_size=2000,
+                flush_callback=lambda n: self.thread_safe_status(f"{n} tag(s) written..."),
+                progress_callback=lambda current, total, message: self.thread_safe_status(message)
             )
             
             self.thread_safe_log("")
@@ -1452,42 +1871,39 @@ class TMGSuiteGUI(tk.Tk):
                                    f"Tags processed: {stats.get('tags_processed', 0)}\n" +
                                    f"Remember to reindex in TMG.")
             
-            self.after(0, show_success)
-            self.status_label.config(text="Injection completed")
+            self.thread_safe_call(show_success)
+            self.thread_safe_status("Injection completed")
             
         except Exception as e:
             self.thread_safe_log(f"Error: {e}", 'ERROR')
-            self.status_label.config(text="Error")
+            self.thread_safe_status("Error")
         finally:
-            self.set_running_state(False)
+            self.thread_safe_call(self.set_running_state, False)
     
     # =========================================================================
     # CONFIG
     # =========================================================================
     def load_config(self):
-        """Charge config"""
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r') as f:
-                    config = json.load(f)
-                self.gedcom_path.set(config.get('gedcom_path', ''))
-                pjc_path = config.get('tmg_project_path', '')
-                self.tmg_project_path.set(pjc_path)
-                if pjc_path:
-                    self._extract_prefix_from_pjc(pjc_path)
-                # Mettre à jour le menu avec les chemins chargés
-                self.update_files_menu()
-            except:
-                pass
+        """Charge config (fichier absent ou illisible : on garde les défauts)"""
+        try:
+            config = _read_config()
+        except (OSError, ValueError):
+            # FileNotFoundError levé par le stat ; JSON invalide -> ValueError
+            return
+        self.gedcom_path.set(config.get('gedcom_path', DEFAULT_CONFIG['gedcom_path']))
+        pjc_path = config.get('tmg_project_path', DEFAULT_CONFIG['tmg_project_path'])
+        self.tmg_project_path.set(pjc_path)
+        if pjc_path:
+            self._extract_prefix_from_pjc(pjc_path)
+        # Mettre à jour le menu avec les chemins chargés
+        self.update_files_menu()
     
     def save_config(self):
         """Sauvegarde config"""
-        config = {
-            'gedcom_path': self.gedcom_path.get(),
-            'tmg_project_path': self.tmg_project_path.get()
-        }
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
+        config = dict(DEFAULT_CONFIG)
+        config['gedcom_path'] = self.gedcom_path.get()
+        config['tmg_project_path'] = self.tmg_project_path.get()
+        _write_config(config)
     
     # =========================================================================
     # HELP MENU FUNCTIONS
@@ -1930,7 +2346,19 @@ STILL HAVING ISSUES?
         self._show_scrollable_dialog("Troubleshooting", troubleshooting_text, width=700, height=650)
     
     def _show_scrollable_dialog(self, title, text, width=650, height=500):
-        """Helper function to show scrollable text dialog"""
+        """
+        Helper function to show scrollable text dialog
+        
+        Le texte est statique : le dialogue est construit une fois par titre,
+        puis masqué à la fermeture et simplement réaffiché.
+        """
+        dialog = self._help_dialogs.get(title)
+        if dialog is not None and dialog.winfo_exists():
+            dialog.deiconify()
+            dialog.lift()
+            dialog.grab_set()
+            return
+        
         dialog = tk.Toplevel(self)
         dialog.title(title)
         dialog.geometry(f"{width}x{height}")
@@ -1954,14 +2382,21 @@ STILL HAVING ISSUES?
         text_widget.insert("1.0", text)
         text_widget.config(state=tk.DISABLED)  # Read-only
         
-        # Close button
+        # Close button : masquer au lieu de détruire
+        def close():
+            dialog.grab_release()
+            dialog.withdraw()
+        
         btn_frame = ttk.Frame(dialog)
         btn_frame.pack(pady=5)
-        ttk.Button(btn_frame, text="Close", command=dialog.destroy, width=15).pack()
+        ttk.Button(btn_frame, text="Close", command=close, width=15).pack()
+        dialog.protocol("WM_DELETE_WINDOW", close)
         
         # Center dialog
         dialog.transient(self)
         dialog.grab_set()
+        
+        self._help_dialogs[title] = dialog
 
 if __name__ == "__main__":
     app = TMGSuiteGUI()
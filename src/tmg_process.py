@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tmg_process.py - Détection de TMG en cours d'exécution
+======================================================
+Contrôle commun à la GUI et aux injecteurs : modifier les fichiers DBF
+pendant que TMG est ouvert peut corrompre la base.
+
+Une seule énumération des processus pour les 3 versions de TMG (psutil si
+installé, sinon un seul tasklist), résultat partagé par tous les modules
+pendant TMG_RUNNING_TTL secondes.
+"""
+
+import sys
+import time
+
+TMG_EXE_NAMES = frozenset({'tmg7.exe', 'tmg8.exe', 'tmg9.exe'})
+TMG_RUNNING_TTL = 2.0  # Secondes pendant lesquelles le résultat est réutilisé
+
+_tmg_running_cache = None  # (time.monotonic(), résultat)
+_psutil = None  # Module psutil chargé au premier contrôle, False si non installé
+
+def _load_psutil():
+    """Import paresseux et optionnel de psutil"""
+    global _psutil
+    if _psutil is None:
+        try:
+            import psutil
+            _psutil = psutil
+        except ImportError:
+            _psutil = False
+    return _psutil
+
+def is_tmg_running():
+    """
+    Vérifie si The Master Genealogist est en cours d'exécution.
+    Supporte TMG v7, v8, v9 (tmg7.exe, tmg8.exe, tmg9.exe).
+    
+    Résultat mémorisé TMG_RUNNING_TTL secondes : le contrôle de la GUI puis
+    celui de l'injecteur n'énumèrent les processus qu'une fois.
+    
+    Returns:
+        bool: True si un processus TMG est détecté
+    """
+    global _tmg_running_cache
+    now = time.monotonic()
+    if _tmg_running_cache and now - _tmg_running_cache[0] < TMG_RUNNING_TTL:
+        return _tmg_running_cache[1]
+    
+    running = _detect_tmg_process()
+    _tmg_running_cache = (now, running)
+    return running
+
+def _detect_tmg_process():
+    """Énumère les processus une fois (psutil si disponible, sinon tasklist)"""
+    if sys.platform != 'win32':
+        return False  # Sur non-Windows, on assume que c'est OK
+    
+    psutil = _load_psutil()
+    if psutil:
+        try:
+            # Énumération en mémoire, arrêt au premier processus TMG
+            for proc in psutil.process_iter(['name']):
+                name = proc.info.get('name') or ''
+                if name.lower() in TMG_EXE_NAMES:
+                    return True
+            return False
+        except Exception:
+            pass  # Repli sur tasklist
+    
+    import subprocess  # Lazy : seulement utile sous Windows
+    try:
+        # Pas de fenêtre console (conhost) pour tasklist
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        startupinfo.wShowWindow = 0  # SW_HIDE
+        
+        # Sortie CSV sans en-tête : "Nom image","PID",...
+        result = subprocess.run(
+            ['tasklist', '/FO', 'CSV', '/NH'],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            startupinfo=startupinfo,
+            creationflags=subprocess.CREATE_NO_WINDOW
+        )
+        for line in result.stdout.splitlines():
+            if line.split(',', 1)[0].strip('"').lower() in TMG_EXE_NAMES:
+                return True
+        return False
+    except Exception as e:
+        # Si la vérification échoue, on continue (mieux que bloquer)
+        print(f"⚠️  Warning: Cannot check if TMG is running: {e}")
+        return False